@@ -0,0 +1,47 @@
+"""Add partial indexes on sessions for active-session lookups
+
+Revision ID: a1f3c9d42b01
+Revises:
+Create Date: 2026-08-29 10:12:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f3c9d42b01'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every session query filters on is_active, so partial indexes keep
+    # only the live rows and stay small as deactivated sessions pile up.
+    op.create_index(
+        'idx_sessions_sid_active',
+        'sessions',
+        ['session_id'],
+        postgresql_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'idx_sessions_user_active',
+        'sessions',
+        ['user_email'],
+        postgresql_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'idx_sessions_expires_active',
+        'sessions',
+        ['expires_at'],
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sessions_expires_active', table_name='sessions')
+    op.drop_index('idx_sessions_user_active', table_name='sessions')
+    op.drop_index('idx_sessions_sid_active', table_name='sessions')
@@ -0,0 +1,51 @@
+"""Add covering indexes for the hot auth lookups
+
+Revision ID: b7e2d81f5c43
+Revises: a1f3c9d42b01
+Create Date: 2026-08-29 11:41:02.754919
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d81f5c43'
+down_revision: Union[str, None] = 'a1f3c9d42b01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Login reads email -> (id, password_hash, name); including those
+    # columns lets Postgres answer with an index-only scan, skipping
+    # the heap fetch per auth request.
+    op.create_index(
+        'ix_users_email_covering',
+        'users',
+        ['email'],
+        postgresql_include=['id', 'password_hash', 'name'],
+    )
+    # Same treatment for the session lookup: carry the columns the
+    # session check reads in the partial index itself.
+    op.drop_index('idx_sessions_sid_active', table_name='sessions')
+    op.create_index(
+        'idx_sessions_sid_active',
+        'sessions',
+        ['session_id'],
+        postgresql_include=['user_email', 'expires_at'],
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sessions_sid_active', table_name='sessions')
+    op.create_index(
+        'idx_sessions_sid_active',
+        'sessions',
+        ['session_id'],
+        postgresql_where=sa.text('is_active'),
+    )
+    op.drop_index('ix_users_email_covering', table_name='users')
@@ -0,0 +1,34 @@
+"""Store session expiry as epoch seconds alongside the timestamp
+
+Revision ID: c4d8a92e7f10
+Revises: b7e2d81f5c43
+Create Date: 2026-08-29 13:05:37.412286
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8a92e7f10'
+down_revision: Union[str, None] = 'b7e2d81f5c43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expiry checks compare plain integers against time.time(); the
+    # DateTime column stays as a human-readable mirror.
+    op.add_column('sessions', sa.Column('expires_at_ts', sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE sessions SET expires_at_ts = EXTRACT(EPOCH FROM expires_at)::bigint"
+    )
+    op.alter_column('sessions', 'expires_at_ts', nullable=False)
+    op.create_index('ix_sessions_expires_at_ts', 'sessions', ['expires_at_ts'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_expires_at_ts', table_name='sessions')
+    op.drop_column('sessions', 'expires_at_ts')
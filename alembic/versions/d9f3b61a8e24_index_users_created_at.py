@@ -0,0 +1,29 @@
+"""Index users.created_at for ordered list queries
+
+Revision ID: d9f3b61a8e24
+Revises: c4d8a92e7f10
+Create Date: 2026-08-29 14:21:09.837514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f3b61a8e24'
+down_revision: Union[str, None] = 'c4d8a92e7f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /users orders by created_at; with the index the ORDER BY ...
+    # LIMIT is an index scan instead of a full-table sort. email already
+    # carries a unique index plus the covering login index.
+    op.create_index('ix_users_created_at', 'users', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at', table_name='users')
@@ -0,0 +1,82 @@
+"""
+DataLoader-style coalescing for hot user lookups.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .database import SessionLocal
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+class UserByEmailLoader:
+    """Coalesce concurrent user-by-email lookups into one SELECT.
+
+    Lookups arriving within the same batch window share a single
+    WHERE email IN (...) query, so a burst of N authenticated requests
+    costs one database round trip instead of N. A solo request only
+    waits out the short window, keeping p50 latency effectively flat.
+    """
+
+    def __init__(self, batch_window: float = 0.005):
+        self._batch_window = batch_window
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def load(self, email: str) -> Optional[User]:
+        """Resolve a user by email, sharing the query with concurrent calls."""
+        future = self._pending.get(email)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[email] = future
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def load_many(self, emails: List[str]) -> List[Optional[User]]:
+        """Resolve several emails at once, preserving order."""
+        return list(await asyncio.gather(*(self.load(e) for e in emails)))
+
+    async def _flush(self):
+        try:
+            await asyncio.sleep(self._batch_window)
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                # The sync query runs on the thread pool so the event loop
+                # keeps serving other requests while Postgres works
+                users = await run_in_threadpool(self._query, list(pending))
+            except Exception as exc:
+                logger.error("Batched user lookup failed", exc_info=True)
+                for future in pending.values():
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            by_email = {user.email: user for user in users}
+            for email, future in pending.items():
+                if not future.done():
+                    future.set_result(by_email.get(email))
+        finally:
+            # Re-arm for lookups that arrived while the query was in
+            # flight: load() saw a not-done flush task and scheduled
+            # nothing, so without this their futures would never
+            # resolve. No done() check here — this task is still
+            # running its own finally, so it never reads as done, and
+            # load() can't have scheduled a competing flush meanwhile.
+            if self._pending:
+                self._flush_task = asyncio.ensure_future(self._flush())
+
+    @staticmethod
+    def _query(emails: List[str]) -> List[User]:
+        db = SessionLocal()
+        try:
+            return db.query(User).filter(User.email.in_(emails)).all()
+        finally:
+            db.close()
+
+# Shared loader instance for the auth endpoints
+user_loader = UserByEmailLoader()
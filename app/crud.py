@@ -1,3 +1,5 @@
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from . import models, schemas
@@ -6,9 +8,34 @@ from typing import Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Built once at import: every call binds a parameter into the same
+# statement object, so SQLAlchemy's compiled cache hits without any
+# per-call construction or lambda analysis
+_USER_BY_EMAIL = select(models.User).where(models.User.email == bindparam("email"))
+
+# Allowlist of sortable columns for the list endpoint. A raw getattr on
+# client input would let requests sort by any model attribute, including
+# password_hash or non-column mapper internals.
+_SUMMARY_ORDER_COLUMNS = {
+    "id": models.User.id,
+    "name": models.User.name,
+    "email": models.User.email,
+    "created_at": models.User.created_at,
+}
+
+def _user_cache(db: Session) -> dict:
+    """Get the request-scoped user lookup cache attached to the session."""
+    return db.info.setdefault("user_cache", {})
+
+def _invalidate_user_cache(db: Session, user_id=None, email=None):
+    """Drop cached lookups for a user after a write."""
+    cache = _user_cache(db)
+    cache.pop(("id", user_id), None)
+    cache.pop(("email", email), None)
+
 class UserCRUD:
     """CRUD operations for User model with error handling and logging."""
-    
+
     @staticmethod
     def get_user(db: Session, user_id: int) -> Optional[models.User]:
         """Get a user by ID.
@@ -21,14 +48,18 @@ class UserCRUD:
             User object if found, None otherwise
         """
         try:
-            user = db.query(models.User).filter(models.User.id == user_id).first()
-            if user:
-                logger.info(f"Retrieved user with ID: {user_id}")
-            else:
-                logger.warning(f"User not found with ID: {user_id}")
+            cache = _user_cache(db)
+            key = ("id", user_id)
+            if key in cache:
+                return cache[key]
+            # Session.get hits the identity map and a cached SELECT-by-PK
+            user = db.get(models.User, user_id)
+            if not user:
+                logger.warning("User not found with ID: %s", user_id)
+            cache[key] = user
             return user
-        except Exception as e:
-            logger.error(f"Error retrieving user {user_id}: {e}")
+        except Exception:
+            logger.error("Error retrieving user %s", user_id, exc_info=True)
             raise
     
     @staticmethod
@@ -43,64 +74,168 @@ class UserCRUD:
             User object if found, None otherwise
         """
         try:
-            user = db.query(models.User).filter(models.User.email == email).first()
-            if user:
-                logger.info(f"Retrieved user with email: {email}")
+            cache = _user_cache(db)
+            key = ("email", email)
+            if key in cache:
+                return cache[key]
+            # Module-level prepared statement; only the bind changes
+            user = db.execute(_USER_BY_EMAIL, {"email": email}).scalars().first()
+            cache[key] = user
             return user
-        except Exception as e:
-            logger.error(f"Error retrieving user by email {email}: {e}")
+        except Exception:
+            logger.error("Error retrieving user by email %s", email, exc_info=True)
             raise
     
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
+    def get_users(db: Session, skip: int = 0, limit: int = 100,
+                  after_id: Optional[int] = None) -> List[models.User]:
         """Get all users with pagination.
-        
+
+        Prefer keyset pagination via after_id: the query seeks directly to
+        id > after_id instead of scanning and discarding skip rows, so deep
+        pages stay cheap. The skip/offset path is kept for callers that
+        still use it.
+
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (legacy offset pagination)
             limit: Maximum number of records to return
-            
+            after_id: Return users with id greater than this (keyset pagination)
+
         Returns:
-            List of User objects
+            List of User objects ordered by id
         """
         try:
-            users = db.query(models.User).offset(skip).limit(limit).all()
-            logger.info(f"Retrieved {len(users)} users (skip={skip}, limit={limit})")
+            query = db.query(models.User).order_by(models.User.id)
+            if after_id is not None:
+                query = query.filter(models.User.id > after_id)
+            elif skip:
+                query = query.offset(skip)
+            users = query.limit(limit).all()
+            logger.info("Retrieved %d users (skip=%s, after_id=%s, limit=%s)", len(users), skip, after_id, limit)
             return users
-        except Exception as e:
-            logger.error(f"Error retrieving users: {e}")
+        except Exception:
+            logger.error("Error retrieving users", exc_info=True)
             raise
     
     @staticmethod
-    def create_user(db: Session, user: schemas.UserCreate) -> models.User:
+    def get_users_summary(db: Session, skip: int = 0, limit: int = 100,
+                          order_by: str = "id", descending: bool = False) -> List:
+        """Get users as lightweight column projections for list endpoints.
+
+        Selects only the columns the summary schema needs instead of
+        hydrating full ORM instances, so each row skips password_hash
+        and the identity-map bookkeeping. A count() window function rides
+        along on the same statement, so the page and the total arrive in
+        one round trip instead of two queries.
+
+        Args:
+            db: Database session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            order_by: Column name to order by (falls back to id)
+            descending: Order direction
+
+        Returns:
+            Tuple of (list of Row objects with the summary columns, total
+            user count)
+        """
+        try:
+            order_field = _SUMMARY_ORDER_COLUMNS.get(order_by, models.User.id)
+            stmt = select(
+                models.User.id,
+                models.User.name,
+                models.User.email,
+                models.User.age,
+                models.User.bio,
+                models.User.created_at,
+                models.User.updated_at,
+                func.count().over().label("total"),
+            ).order_by(order_field.desc() if descending else order_field.asc())
+            rows = db.execute(stmt.offset(skip).limit(limit)).all()
+            if rows:
+                total = rows[0].total
+            elif skip:
+                # Page past the end: the window count never materialized,
+                # fall back to a plain count so the client still sees it
+                total = db.execute(select(func.count()).select_from(models.User)).scalar()
+            else:
+                total = 0
+            return rows, total
+        except Exception:
+            logger.error("Error retrieving user summaries", exc_info=True)
+            raise
+
+    @staticmethod
+    def create_user(db: Session, user: schemas.UserCreate) -> Optional[models.User]:
         """Create a new user.
-        
+
+        One atomic INSERT ... ON CONFLICT DO NOTHING ... RETURNING: no
+        pre-check SELECT, no race with concurrent registrations, and a
+        duplicate email is an ordinary empty result instead of a rolled
+        back exception.
+
         Args:
             db: Database session
             user: User data to create
-            
+
         Returns:
-            Created User object
-            
-        Raises:
-            IntegrityError: If email already exists
+            Created User object, or None if the email is already taken
         """
         try:
-            db_user = models.User(**user.model_dump())
-            db.add(db_user)
+            stmt = (
+                pg_insert(models.User)
+                .values(**user.model_dump())
+                .on_conflict_do_nothing(index_elements=["email"])
+                .returning(models.User)
+            )
+            db_user = db.execute(stmt).scalar_one_or_none()
             db.commit()
-            db.refresh(db_user)
-            logger.info(f"Created user with ID: {db_user.id}, email: {db_user.email}")
+            if db_user is None:
+                logger.warning("Duplicate email on user create: %s", user.email)
+                return None
+            _invalidate_user_cache(db, user_id=db_user.id, email=db_user.email)
+            logger.info("Created user with ID: %s, email: %s", db_user.id, db_user.email)
             return db_user
-        except IntegrityError as e:
+        except Exception:
+            db.rollback()
+            logger.error("Error creating user", exc_info=True)
+            raise
+    
+    @staticmethod
+    def create_users(db: Session, users: List[schemas.UserCreate]) -> List[models.User]:
+        """Create multiple users in one round trip.
+
+        Uses SQLAlchemy's insertmanyvalues support so the rows are sent
+        as batched multi-row VALUES clauses instead of one INSERT per user.
+
+        Args:
+            db: Database session
+            users: List of user data to create
+
+        Returns:
+            List of created User objects
+
+        Raises:
+            IntegrityError: If any email already exists
+        """
+        if not users:
+            return []
+        try:
+            stmt = insert(models.User).returning(models.User)
+            rows = db.execute(stmt, [u.model_dump() for u in users]).scalars().all()
+            db.commit()
+            logger.info("Created %d users in bulk", len(rows))
+            return list(rows)
+        except IntegrityError:
             db.rollback()
-            logger.error(f"Integrity error creating user: {e}")
+            logger.error("Integrity error bulk-creating users", exc_info=True)
             raise
-        except Exception as e:
+        except Exception:
             db.rollback()
-            logger.error(f"Error creating user: {e}")
+            logger.error("Error bulk-creating users", exc_info=True)
             raise
-    
+
     @staticmethod
     def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> Optional[models.User]:
         """Update a user.
@@ -117,27 +252,34 @@ class UserCRUD:
             IntegrityError: If email already exists for another user
         """
         try:
-            db_user = db.query(models.User).filter(models.User.id == user_id).first()
-            if not db_user:
-                logger.warning(f"User not found for update with ID: {user_id}")
-                return None
-            
             # Update only provided fields
             update_data = user_update.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_user, field, value)
-            
+            if not update_data:
+                return UserCRUD.get_user(db, user_id)
+
+            # Single UPDATE ... RETURNING instead of SELECT + mutate + refresh
+            stmt = (
+                update(models.User)
+                .where(models.User.id == user_id)
+                .values(**update_data)
+                .returning(models.User)
+            )
+            db_user = db.execute(stmt).scalar_one_or_none()
             db.commit()
-            db.refresh(db_user)
-            logger.info(f"Updated user with ID: {user_id}")
+            if db_user is None:
+                logger.warning("User not found for update with ID: %s", user_id)
+                return None
+
+            _invalidate_user_cache(db, user_id=user_id, email=db_user.email)
+            logger.info("Updated user with ID: %s", user_id)
             return db_user
-        except IntegrityError as e:
+        except IntegrityError:
             db.rollback()
-            logger.error(f"Integrity error updating user {user_id}: {e}")
+            logger.error("Integrity error updating user %s", user_id, exc_info=True)
             raise
-        except Exception as e:
+        except Exception:
             db.rollback()
-            logger.error(f"Error updating user {user_id}: {e}")
+            logger.error("Error updating user %s", user_id, exc_info=True)
             raise
     
     @staticmethod
@@ -152,18 +294,24 @@ class UserCRUD:
             True if deleted, False if not found
         """
         try:
-            db_user = db.query(models.User).filter(models.User.id == user_id).first()
-            if not db_user:
-                logger.warning(f"User not found for deletion with ID: {user_id}")
-                return False
-            
-            db.delete(db_user)
+            # Single DELETE ... RETURNING instead of SELECT + delete;
+            # the returned email feeds cache invalidation
+            stmt = (
+                delete(models.User)
+                .where(models.User.id == user_id)
+                .returning(models.User.email)
+            )
+            email = db.execute(stmt).scalar_one_or_none()
             db.commit()
-            logger.info(f"Deleted user with ID: {user_id}")
+            if email is None:
+                logger.warning("User not found for deletion with ID: %s", user_id)
+                return False
+            _invalidate_user_cache(db, user_id=user_id, email=email)
+            logger.info("Deleted user with ID: %s", user_id)
             return True
-        except Exception as e:
+        except Exception:
             db.rollback()
-            logger.error(f"Error deleting user {user_id}: {e}")
+            logger.error("Error deleting user %s", user_id, exc_info=True)
             raise
 
 # Create CRUD instance
@@ -22,45 +22,34 @@ DATABASE_URL = os.getenv(
     f"{os.getenv('DATABASE_NAME', 'your_database')}"
 )
 
-try:
-    # Create SQLAlchemy engine with connection pooling and error handling
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,  # Validate connections before use
-        pool_recycle=3600,   # Recycle connections after 1 hour
-        echo=os.getenv("DEBUG", "False").lower() == "true"  # Log SQL queries in debug mode
-    )
-    
-    # Test connection
-    with engine.connect() as conn:
-        pass
-    
-    # Create session factory
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create declarative base for models
-    Base = declarative_base()
-    
-    logger.info("Database configuration initialized successfully")
-    
-except Exception as e:
-    logger.warning(f"Database connection failed: {e}")
-    logger.info("Creating engine without testing connection for development mode")
-    
-    # Create engine without testing connection (for development without DB)
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,
-        pool_recycle=3600,
-        echo=os.getenv("DEBUG", "False").lower() == "true"
-    )
-    
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base = declarative_base()
+# Create SQLAlchemy engine with connection pooling. No connection is
+# opened at import time: pool_pre_ping validates connections lazily, so
+# workers can boot without waiting on a database round trip.
+# Pool sizing is tunable per deployment: each pre-forked worker gets its
+# own pool, so size for (workers x pool_size) total connections. For
+# multi-worker setups behind pgbouncer (transaction mode), keep these
+# small and let the bouncer do the pooling.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_pre_ping=True,  # Validate connections before use
+    pool_recycle=3600,   # Recycle connections after 1 hour
+    insertmanyvalues_page_size=1000,  # Batch size for bulk INSERT ... VALUES
+    executemany_mode="values_plus_batch",  # Batch non-INSERT executemany too (psycopg2)
+    query_cache_size=1200,  # Room for the compiled-statement cache
+    echo=os.getenv("DEBUG", "False").lower() == "true"  # Log SQL queries in debug mode
+)
+
+# Create session factory. Sessions are request-scoped, so instances do
+# not need to be expired on commit; with eager_defaults on the models,
+# RETURNING populates server defaults and no refresh SELECT is issued.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Create declarative base for models
+Base = declarative_base()
+
+logger.info("Database configuration initialized successfully")
 
 # Dependency to get database session
 def get_db():
@@ -70,6 +59,8 @@ def get_db():
         Session: SQLAlchemy database session
     """
     db = SessionLocal()
+    # Request-scoped cache for repeated user lookups (see crud.UserCRUD)
+    db.info["user_cache"] = {}
     try:
         yield db
     except Exception as e:
@@ -1,298 +1,230 @@
 """
 Database-backed session storage for secure token management.
 """
-import uuid
+import secrets
+import time
 from typing import Dict, Optional
 from datetime import datetime, timedelta, timezone
 import logging
 from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam, select, update
 
 from .models import Session
-from .database import get_db
+from . import session_buffer
 
 logger = logging.getLogger(__name__)
 
+# Built once at import; lookups bind session_id/now into the same
+# statement object so the compiled-SQL cache always hits
+_ACTIVE_SESSION_STMT = select(Session).where(
+    and_(
+        Session.session_id == bindparam("sid"),
+        Session.is_active == True,
+        Session.expires_at > bindparam("now")
+    )
+)
+
 class DatabaseSessionStore:
-    """Database-backed session store for secure token management."""
-    
+    """Database-backed session store for secure token management.
+
+    All methods require the caller's database session (the one provided
+    by the get_db dependency) so each request reuses a single pooled
+    connection instead of opening its own.
+    """
+
     def __init__(self):
         self._default_expires_minutes = 30
-    
-    def create_session(self, user_email: str, expires_in_minutes: int = None, db: DBSession = None) -> str:
+        self._cleanup_interval = 300  # 5 minutes
+        self._last_cleanup = 0.0
+        # Short-TTL memo of resolved sessions: the same cookie arrives
+        # many times within seconds, so remembering the lookup briefly
+        # removes the per-request SELECT. Writes (logout, extend,
+        # logout-all) invalidate eagerly.
+        self._auth_cache: Dict[str, tuple] = {}
+        self._auth_cache_ttl = 10  # seconds
+        self._auth_cache_max = 4096
+
+    def create_session(self, user_email: str, expires_in_minutes: int = None, *, db: DBSession) -> str:
         """Create a new session in the database and return session ID."""
         if expires_in_minutes is None:
             expires_in_minutes = self._default_expires_minutes
-            
-        session_id = str(uuid.uuid4())
+
+        # 32-char URL-safe token: shorter than a hyphenated UUID, so the
+        # session index packs more entries per page
+        session_id = secrets.token_urlsafe(24)
         expires_at = datetime.now(timezone.utc) + timedelta(minutes=expires_in_minutes)
-        
+
         # Create database session
         db_session = Session(
             session_id=session_id,
             user_email=user_email,
             expires_at=expires_at,
+            expires_at_ts=int(time.time()) + expires_in_minutes * 60,
             is_active=True
         )
-        
-        if db is None:
-            # If no db session provided, create one
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                db.add(db_session)
-                db.commit()
-                db.refresh(db_session)
-            finally:
-                db.close()
-        else:
-            # Use provided db session
-            db.add(db_session)
-            db.commit()
-            db.refresh(db_session)
-        
-        logger.info(f"Created database session {session_id} for user {user_email}")
-        
-        # Clean up expired sessions periodically
-        self._cleanup_expired_sessions(db if db else None)
-        
+
+        db.add(db_session)
+        db.commit()
+
+        logger.info("Created database session %s for user %s", session_id, user_email)
+
+        # Clean up expired sessions at most once per interval so the
+        # login path normally stays a single INSERT
+        if time.monotonic() - self._last_cleanup >= self._cleanup_interval:
+            self._last_cleanup = time.monotonic()
+            self._cleanup_expired_sessions(db)
+
         return session_id
-    
-    def get_session(self, session_id: str, db: DBSession = None) -> Optional[Dict]:
+
+    def get_session(self, session_id: str, *, db: DBSession) -> Optional[Dict]:
         """Get session data by session ID from database."""
         if not session_id:
             return None
-        
-        # Get database session
-        if db is None:
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                db_session = db.query(Session).filter(
-                    and_(
-                        Session.session_id == session_id,
-                        Session.is_active == True
-                    )
-                ).first()
-            finally:
-                db.close()
-        else:
-            db_session = db.query(Session).filter(
-                and_(
-                    Session.session_id == session_id,
-                    Session.is_active == True
-                )
-            ).first()
-        
+
+        hit = self._auth_cache.get(session_id)
+        if hit is not None and hit[0] > time.monotonic():
+            session_buffer.touch(session_id)
+            return hit[1]
+
+        # Expiry is checked in the WHERE clause; expired rows simply miss
+        # and are deactivated in bulk by _cleanup_expired_sessions
+        now = datetime.now(timezone.utc)
+        db_session = db.execute(
+            _ACTIVE_SESSION_STMT, {"sid": session_id, "now": now}
+        ).scalars().first()
+
         if not db_session:
             return None
-        
-        # Check if session is expired
-        if db_session.is_expired():
-            self.delete_session(session_id, db)
-            return None
-        
-        # Update last accessed time
-        db_session.last_accessed = datetime.now(timezone.utc)
-        if db is None:
-            from .database import SessionLocal
-            temp_db = SessionLocal()
-            try:
-                temp_db.merge(db_session)
-                temp_db.commit()
-            finally:
-                temp_db.close()
-        else:
-            db.commit()
-        
-        # Return session data as dict
-        return {
+
+        # Capture the row before any commit expires the ORM instance
+        last_accessed = db_session.last_accessed
+        session_data = {
             "user_email": db_session.user_email,
             "created_at": db_session.created_at,
             "expires_at": db_session.expires_at,
-            "last_accessed": db_session.last_accessed,
+            "last_accessed": last_accessed,
             "session_id": db_session.session_id
         }
-    
-    def delete_session(self, session_id: str, db: DBSession = None) -> bool:
+
+        # Record the access in the write-behind buffer; the background
+        # flusher folds a window of touches into one batched UPDATE
+        # instead of one UPDATE per authenticated request
+        session_buffer.touch(session_id)
+
+        if len(self._auth_cache) >= self._auth_cache_max:
+            self._auth_cache.clear()
+        self._auth_cache[session_id] = (time.monotonic() + self._auth_cache_ttl, session_data)
+
+        return session_data
+
+    def delete_session(self, session_id: str, *, db: DBSession) -> bool:
         """Delete session from database by session ID."""
         if not session_id:
             return False
-        
-        if db is None:
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                db_session = db.query(Session).filter(Session.session_id == session_id).first()
-                if db_session:
-                    db_session.is_active = False
-                    db.commit()
-                    logger.info(f"Deactivated database session {session_id}")
-                    return True
-            finally:
-                db.close()
-        else:
-            db_session = db.query(Session).filter(Session.session_id == session_id).first()
-            if db_session:
-                db_session.is_active = False
-                db.commit()
-                logger.info(f"Deactivated database session {session_id}")
-                return True
-        
+
+        self._auth_cache.pop(session_id, None)
+        db_session = db.query(Session).filter(Session.session_id == session_id).first()
+        if db_session:
+            db_session.is_active = False
+            db.commit()
+            logger.info("Deactivated database session %s", session_id)
+            return True
+
         return False
-    
-    def extend_session(self, session_id: str, minutes: int = 30, db: DBSession = None) -> bool:
+
+    def extend_session(self, session_id: str, minutes: int = 30, *, db: DBSession) -> bool:
         """Extend session expiration time."""
         if not session_id:
             return False
-        
-        if db is None:
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                db_session = db.query(Session).filter(
-                    and_(
-                        Session.session_id == session_id,
-                        Session.is_active == True
-                    )
-                ).first()
-                if db_session and not db_session.is_expired():
-                    db_session.extend_session(minutes)
-                    db.commit()
-                    logger.info(f"Extended database session {session_id} by {minutes} minutes")
-                    return True
-            finally:
-                db.close()
-        else:
-            db_session = db.query(Session).filter(
-                and_(
-                    Session.session_id == session_id,
-                    Session.is_active == True
-                )
-            ).first()
-            if db_session and not db_session.is_expired():
-                db_session.extend_session(minutes)
-                db.commit()
-                logger.info(f"Extended database session {session_id} by {minutes} minutes")
-                return True
-        
+
+        self._auth_cache.pop(session_id, None)
+        now = datetime.now(timezone.utc)
+        db_session = db.execute(
+            _ACTIVE_SESSION_STMT, {"sid": session_id, "now": now}
+        ).scalars().first()
+        if db_session:
+            db_session.extend_session(minutes)
+            db.commit()
+            logger.info("Extended database session %s by %d minutes", session_id, minutes)
+            return True
+
         return False
-    
-    def get_user_sessions(self, user_email: str, db: DBSession = None) -> list:
-        """Get all active sessions for a user."""
-        if db is None:
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                sessions = db.query(Session).filter(
-                    and_(
-                        Session.user_email == user_email,
-                        Session.is_active == True
-                    )
-                ).all()
-                return [
-                    {
-                        "session_id": s.session_id,
-                        "created_at": s.created_at,
-                        "expires_at": s.expires_at,
-                        "last_accessed": s.last_accessed
-                    }
-                    for s in sessions if not s.is_expired()
-                ]
-            finally:
-                db.close()
-        else:
-            sessions = db.query(Session).filter(
+
+    def owns_session(self, user_email: str, session_id: str, *, db: DBSession) -> bool:
+        """Check that an active session belongs to a user.
+
+        A single indexed one-row SELECT, instead of loading every
+        session the user owns and scanning in Python.
+        """
+        return db.execute(
+            select(Session.id).where(
                 and_(
+                    Session.session_id == session_id,
                     Session.user_email == user_email,
                     Session.is_active == True
                 )
-            ).all()
-            return [
-                {
-                    "session_id": s.session_id,
-                    "created_at": s.created_at,
-                    "expires_at": s.expires_at,
-                    "last_accessed": s.last_accessed
-                }
-                for s in sessions if not s.is_expired()
-            ]
-    
-    def delete_all_user_sessions(self, user_email: str, db: DBSession = None) -> int:
+            ).limit(1)
+        ).first() is not None
+
+    def get_user_sessions(self, user_email: str, *, db: DBSession) -> list:
+        """Get all active sessions for a user."""
+        sessions = db.query(Session).filter(
+            and_(
+                Session.user_email == user_email,
+                Session.is_active == True
+            )
+        ).all()
+        return [
+            {
+                "session_id": s.session_id,
+                "created_at": s.created_at,
+                "expires_at": s.expires_at,
+                "last_accessed": s.last_accessed
+            }
+            for s in sessions if not s.is_expired()
+        ]
+
+    def delete_all_user_sessions(self, user_email: str, *, db: DBSession) -> int:
         """Delete all sessions for a user (logout from all devices)."""
-        if db is None:
-            from .database import SessionLocal
-            db = SessionLocal()
-            try:
-                sessions = db.query(Session).filter(
-                    and_(
-                        Session.user_email == user_email,
-                        Session.is_active == True
-                    )
-                ).all()
-                count = len(sessions)
-                for session in sessions:
-                    session.is_active = False
-                db.commit()
-                logger.info(f"Deactivated {count} sessions for user {user_email}")
-                return count
-            finally:
-                db.close()
-        else:
-            sessions = db.query(Session).filter(
+        # Drop any cached entries belonging to this user
+        for sid in [
+            sid for sid, (_, data) in self._auth_cache.items()
+            if data["user_email"] == user_email
+        ]:
+            self._auth_cache.pop(sid, None)
+        stmt = update(Session).where(
+            and_(
+                Session.user_email == user_email,
+                Session.is_active == True
+            )
+        ).values(is_active=False)
+
+        result = db.execute(stmt)
+        db.commit()
+
+        count = result.rowcount
+        logger.info("Deactivated %d sessions for user %s", count, user_email)
+        return count
+
+    def _cleanup_expired_sessions(self, db: DBSession):
+        """Clean up expired sessions from database."""
+        try:
+            # Deactivate expired sessions with a single bulk UPDATE
+            stmt = update(Session).where(
                 and_(
-                    Session.user_email == user_email,
+                    Session.expires_at < datetime.now(timezone.utc),
                     Session.is_active == True
                 )
-            ).all()
-            count = len(sessions)
-            for session in sessions:
-                session.is_active = False
+            ).values(is_active=False)
+
+            result = db.execute(stmt)
             db.commit()
-            logger.info(f"Deactivated {count} sessions for user {user_email}")
-            return count
-    
-    def _cleanup_expired_sessions(self, db: DBSession = None):
-        """Clean up expired sessions from database."""
-        try:
-            if db is None:
-                from .database import SessionLocal
-                db = SessionLocal()
-                try:
-                    # Deactivate expired sessions
-                    expired_sessions = db.query(Session).filter(
-                        and_(
-                            Session.expires_at < datetime.now(timezone.utc),
-                            Session.is_active == True
-                        )
-                    ).all()
-                    
-                    count = len(expired_sessions)
-                    if count > 0:
-                        for session in expired_sessions:
-                            session.is_active = False
-                        db.commit()
-                        logger.info(f"Cleaned up {count} expired sessions")
-                finally:
-                    db.close()
-            else:
-                # Deactivate expired sessions
-                expired_sessions = db.query(Session).filter(
-                    and_(
-                        Session.expires_at < datetime.now(timezone.utc),
-                        Session.is_active == True
-                    )
-                ).all()
-                
-                count = len(expired_sessions)
-                if count > 0:
-                    for session in expired_sessions:
-                        session.is_active = False
-                    db.commit()
-                    logger.info(f"Cleaned up {count} expired sessions")
-                    
-        except Exception as e:
-            logger.error(f"Error during session cleanup: {e}")
+
+            if result.rowcount > 0:
+                logger.info("Cleaned up %d expired sessions", result.rowcount)
+
+        except Exception:
+            logger.error("Error during session cleanup", exc_info=True)
 
 # Global session store instance
-session_store = DatabaseSessionStore()
\ No newline at end of file
+session_store = DatabaseSessionStore()
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Boolean, Index, text
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta, timezone
+import time
 from .database import Base
 
 class User(Base):
@@ -16,6 +17,15 @@ class User(Base):
         updated_at: Timestamp when user was last updated
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Covering index: login resolves email -> (id, password_hash,
+        # name) with an index-only scan, no heap fetch
+        Index("ix_users_email_covering", "email",
+              postgresql_include=["id", "password_hash", "name"]),
+    )
+    # Fetch server defaults (id, created_at, updated_at) via RETURNING on
+    # INSERT/UPDATE so no refresh SELECT is needed afterwards
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
@@ -23,7 +33,9 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     age = Column(Integer, nullable=True)
     bio = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Indexed: the list endpoint orders by created_at, so the ORDER BY
+    # ... LIMIT becomes an index scan instead of a sort over the table
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
@@ -35,20 +47,34 @@ class Session(Base):
     
     Attributes:
         id: Primary key, auto-incrementing integer
-        session_id: Unique session identifier (UUID)
+        session_id: Unique session identifier (URL-safe random token)
         user_email: Email of the authenticated user
         created_at: When the session was created
-        expires_at: When the session expires
+        expires_at: When the session expires (human-readable mirror)
+        expires_at_ts: Expiry as epoch seconds, used for comparisons
         last_accessed: When the session was last accessed
         is_active: Whether the session is still active
     """
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Partial indexes matching the hot predicates: every lookup
+        # filters on is_active, so only live sessions are indexed
+        Index("idx_sessions_sid_active", "session_id",
+              postgresql_include=["user_email", "expires_at"],
+              postgresql_where=text("is_active")),
+        Index("idx_sessions_user_active", "user_email", postgresql_where=text("is_active")),
+        Index("idx_sessions_expires_active", "expires_at", postgresql_where=text("is_active")),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), unique=True, nullable=False, index=True)
+    session_id = Column(String(64), unique=True, nullable=False, index=True)
     user_email = Column(String(255), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Epoch-seconds mirror of expires_at: expiry checks compare plain
+    # ints against time.time() instead of allocating aware datetimes
+    expires_at_ts = Column(BigInteger, nullable=False, index=True)
     last_accessed = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
 
@@ -57,9 +83,11 @@ class Session(Base):
     
     def is_expired(self) -> bool:
         """Check if the session is expired."""
-        return datetime.now(timezone.utc) > self.expires_at
+        return time.time() > self.expires_at_ts
     
     def extend_session(self, minutes: int = 30):
         """Extend the session expiration time."""
-        self.expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
-        self.last_accessed = datetime.now(timezone.utc)
\ No newline at end of file
+        now = datetime.now(timezone.utc)
+        self.expires_at_ts = int(time.time()) + minutes * 60
+        self.expires_at = now + timedelta(minutes=minutes)
+        self.last_accessed = now
\ No newline at end of file
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from datetime import timedelta
 import logging
 
 from ..database import get_db
-from ..security import security_manager, get_current_user
+from ._utils import safe_endpoint
+from ..security import security_manager, get_current_user, acached_verify_password, _DUMMY_HASH
+from ..batching import user_loader
+from .users import _invalidate_list_cache
 from .. import schemas, models, crud
 
 logger = logging.getLogger(__name__)
@@ -23,166 +27,177 @@ router = APIRouter(
     summary="Register a new user",
     description="Create a new user account with email and password."
 )
+@safe_endpoint(detail="Internal server error during registration")
 async def register(user_data: schemas.UserRegister, db: Session = Depends(get_db)):
     """Register a new user."""
-    try:
-        # Check if user already exists
-        existing_user = crud.crud.get_user_by_email(db, email=user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        # Hash the password
-        password_hash = security_manager.get_password_hash(user_data.password)
-        
-        # Create user in database
-        db_user = models.User(
+    # Hash the password on the bounded Argon2 pool; ~100 ms of CPU
+    password_hash = await security_manager.aget_password_hash(user_data.password)
+
+    # Single atomic INSERT ... ON CONFLICT DO NOTHING RETURNING:
+    # one round trip instead of select-then-insert, and no race
+    # window between the existence check and the insert
+    stmt = (
+        pg_insert(models.User.__table__)
+        .values(
             name=user_data.name,
             email=user_data.email,
             password_hash=password_hash,
             age=user_data.age,
-            bio=user_data.bio
+            bio=user_data.bio,
         )
-        
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        
-        logger.info(f"New user registered: {user_data.email}")
-        return db_user
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error registering user: {e}")
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(models.User.__table__)
+    )
+    row = db.execute(stmt).first()
+    db.commit()
+
+    if row is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during registration"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
         )
 
+    # Registration is a user write like any other: drop the cached
+    # list pages so GET /users doesn't serve the pre-insert page (and
+    # its ETag) for the rest of the TTL
+    _invalidate_list_cache()
+    logger.info("New user registered: %s", user_data.email)
+    return row._mapping
+
 @router.post(
     "/login",
     response_model=schemas.Token,
     summary="User login",
     description="Authenticate user and return JWT token."
 )
+@safe_endpoint(detail="Internal server error during login")
 async def login(user_credentials: schemas.UserLogin, db: Session = Depends(get_db)):
     """Authenticate user and return JWT token."""
-    try:
-        # Find user by email
-        user = crud.crud.get_user_by_email(db, email=user_credentials.email)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Verify password
-        if not security_manager.verify_password(user_credentials.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Create access token
-        access_token_expires = timedelta(minutes=30)
-        access_token = security_manager.create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+    # Find user by email (coalesced with concurrent lookups)
+    user = await user_loader.load(user_credentials.email)
+    if not user:
+        # Burn the same hashing cost as a real verification so the
+        # response time doesn't leak whether the email exists. Must go
+        # through the same memo as the known-email branch: if only real
+        # accounts got the fast cached retry, repeat submissions would
+        # reopen the timing oracle this branch exists to close.
+        await acached_verify_password(
+            user_credentials.email, user_credentials.password, _DUMMY_HASH
         )
-        
-        logger.info(f"User logged in: {user.email}")
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "expires_in": 1800  # 30 minutes in seconds
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error during login: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during login"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Verify password (memoized for repeat submissions) off the loop
+    password_ok = await acached_verify_password(
+        user.email, user_credentials.password, user.password_hash
+    )
+    if not password_ok:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Create access token carrying the minimal profile so /me can
+    # answer from claims alone. exp stays short (30 min), so stale
+    # claims don't outlive the token.
+    access_token_expires = timedelta(minutes=30)
+    access_token = security_manager.create_access_token(
+        data={"sub": user.email, "uid": user.id, "name": user.name, "age": user.age},
+        expires_delta=access_token_expires
+    )
+
+    logger.info("User logged in: %s", user.email)
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": 1800  # 30 minutes in seconds
+    }
+
 @router.get(
     "/me",
-    response_model=schemas.UserCreateResponse,
+    response_model=schemas.UserCreateResponse | schemas.UserClaims,
     summary="Get current user",
-    description="Get information about the currently authenticated user."
+    description="Get information about the currently authenticated user. "
+                "Served from token claims; pass full=1 for bio and timestamps."
 )
+@safe_endpoint()
 async def get_current_user_info(
+    full: bool = Query(False, description="Fetch the full profile from the database"),
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get current user information."""
-    try:
-        user = crud.crud.get_user_by_email(db, email=current_user_data["email"])
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        return user
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting current user: {e}")
+    """Get current user information, from JWT claims when possible."""
+    # Tokens minted at login carry the profile; only hit the
+    # database for the full record or for pre-claims tokens
+    if not full and "uid" in current_user_data:
+        return schemas.UserClaims(
+            id=current_user_data["uid"],
+            name=current_user_data["name"],
+            email=current_user_data["email"],
+            age=current_user_data.get("age"),
+        )
+
+    user = await user_loader.load(current_user_data["email"])
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
         )
 
+    return user
+
+@router.post(
+    "/me/batch",
+    response_model=list[schemas.UserCreateResponse | None],
+    summary="Look up several users at once",
+    description="Resolve multiple emails in a single database round trip."
+)
+@safe_endpoint()
+async def get_users_batch(
+    batch: schemas.EmailBatchRequest,
+    current_user_data: dict = Depends(get_current_user)
+):
+    """Resolve a list of emails through the batched loader, preserving order."""
+    return await user_loader.load_many(batch.emails)
+
 @router.post(
     "/change-password",
     summary="Change password",
     description="Change the password for the currently authenticated user."
 )
+@safe_endpoint()
 async def change_password(
-    old_password: str,
-    new_password: str,
+    body: schemas.PasswordChangeRequest,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Change user password."""
-    try:
-        user = crud.crud.get_user_by_email(db, email=current_user_data["email"])
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        # Verify old password
-        if not security_manager.verify_password(old_password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid current password"
-            )
-        
-        # Update password
-        user.password_hash = security_manager.get_password_hash(new_password)
-        db.commit()
-        
-        logger.info(f"Password changed for user: {user.email}")
-        
-        return {"message": "Password changed successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error changing password: {e}")
+    user = crud.crud.get_user_by_email(db, email=current_user_data["email"])
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    # Verify old password (memoized for repeat submissions) off the loop
+    old_password_ok = await acached_verify_password(
+        user.email, body.old_password, user.password_hash
+    )
+    if not old_password_ok:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
\ No newline at end of file
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid current password"
+        )
+
+    # Update password
+    user.password_hash = await security_manager.aget_password_hash(body.new_password)
+    db.commit()
+
+    logger.info("Password changed for user: %s", user.email)
+
+    return {"message": "Password changed successfully"}
\ No newline at end of file
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query, Path, Body, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from typing import List, Literal, Optional, Dict, Any, Set
+from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
+from itertools import count, islice
+import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,18 +25,89 @@ class Task(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     completed: bool = False
-    priority: str = Field("medium", pattern="^(low|medium|high)$")
+    # Literal compiles to a set-membership check instead of running a
+    # regex per validation
+    priority: Literal["low", "medium", "high"] = "medium"
     created_at: Optional[datetime] = None
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     completed: Optional[bool] = None
-    priority: Optional[str] = Field(None, pattern="^(low|medium|high)$")
+    priority: Optional[Literal["low", "medium", "high"]] = None
 
-# In-memory storage
-tasks_db: List[Task] = []
-task_counter = 0
+@dataclass(slots=True)
+class TaskRecord:
+    """Stored form of a task.
+
+    A slotted dataclass instead of a live Pydantic model: attribute
+    reads and the patch-path setattr are plain slot accesses with no
+    validation machinery, and per-instance memory roughly halves.
+    Validation happens once at the request boundary via Task.
+    """
+    id: int
+    title: str
+    description: Optional[str]
+    completed: bool
+    priority: str
+    created_at: datetime
+
+# In-memory storage: keyed by task id so lookups are one dict probe
+# instead of a scan; dicts preserve insertion order for listing
+tasks_db: Dict[int, TaskRecord] = {}
+# next() on a C-level count iterator is atomic under the GIL, unlike
+# the read-modify-write of a global counter
+_id_gen = count(1)
+
+# Inverted indexes for the get_tasks filters: each bucket holds task
+# ids, so a filtered listing intersects small sets instead of copying
+# and re-scanning the whole store
+by_completed: Dict[bool, Set[int]] = {False: set(), True: set()}
+by_priority: Dict[str, Set[int]] = {}
+
+# Lowercased (title, description) per task, computed once at write
+# time so search doesn't re-lower every string on every query
+search_index: Dict[int, tuple] = {}
+
+# Trigram posting lists over the lowercased text: a query only has to
+# verify tasks whose text contains every 3-gram of the query, instead
+# of scanning the whole store
+trigram_index: Dict[str, Set[int]] = defaultdict(set)
+
+def _trigrams(text: str) -> Set[str]:
+    """All 3-grams of a string (empty for strings shorter than 3)."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+@lru_cache(maxsize=256)
+def _search_pattern(q: str) -> "re.Pattern":
+    """Compiled case-insensitive literal matcher, cached across requests.
+
+    The IGNORECASE matcher runs in C and folds case on the fly, so the
+    query itself never needs lowering or re-compiling per request.
+    """
+    return re.compile(re.escape(q), re.IGNORECASE)
+
+def _index_task(task: TaskRecord) -> None:
+    """Add a task to the filter buckets and the search indexes."""
+    by_completed[task.completed].add(task.id)
+    by_priority.setdefault(task.priority, set()).add(task.id)
+    title_lc = task.title.lower()
+    desc_lc = (task.description or "").lower()
+    search_index[task.id] = (title_lc, desc_lc)
+    for gram in _trigrams(title_lc) | _trigrams(desc_lc):
+        trigram_index[gram].add(task.id)
+
+def _unindex_task(task: TaskRecord) -> None:
+    """Remove a task from the filter buckets and the search indexes."""
+    by_completed[task.completed].discard(task.id)
+    bucket = by_priority.get(task.priority)
+    if bucket is not None:
+        bucket.discard(task.id)
+    cached = search_index.pop(task.id, None)
+    if cached is not None:
+        title_lc, desc_lc = cached
+        for gram in _trigrams(title_lc) | _trigrams(desc_lc):
+            trigram_index[gram].discard(task.id)
 
 # 1. Basic GET endpoint
 @router.get("/", summary="Welcome to examples")
@@ -52,13 +129,17 @@ async def get_task(
     task_id: int = Path(..., description="The ID of the task to retrieve", ge=1)
 ):
     """Get a specific task by ID."""
-    task = next((t for t in tasks_db if t.id == task_id), None)
+    task = tasks_db.get(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
-    return task
+    # The stored record was validated on the way in; orjson serializes
+    # dataclasses natively, and returning a Response skips FastAPI's
+    # response_model re-validation while the decorator keeps the
+    # documented schema
+    return ORJSONResponse(task)
 
 # 3. GET with query parameters
 @router.get("/tasks", response_model=List[Task], summary="Get all tasks")
@@ -69,28 +150,32 @@ async def get_tasks(
     offset: int = Query(0, description="Number of tasks to skip", ge=0)
 ):
     """Get all tasks with optional filtering and pagination."""
-    filtered_tasks = tasks_db.copy()
-    
+    # Intersect the relevant index buckets; None means "no filter"
+    candidate_ids = None
     if completed is not None:
-        filtered_tasks = [t for t in filtered_tasks if t.completed == completed]
-    
+        candidate_ids = by_completed[completed]
     if priority:
-        filtered_tasks = [t for t in filtered_tasks if t.priority == priority]
+        bucket = by_priority.get(priority, set())
+        candidate_ids = bucket if candidate_ids is None else candidate_ids & bucket
     
-    # Apply pagination
-    paginated_tasks = filtered_tasks[offset:offset + limit]
+    if candidate_ids is None:
+        tasks_iter = iter(tasks_db.values())
+    else:
+        # Ids are assigned in insertion order, so sorting keeps the
+        # listing stable across filters
+        tasks_iter = (tasks_db[i] for i in sorted(candidate_ids))
     
-    return paginated_tasks
+    # Materialize only the requested page
+    return ORJSONResponse(list(islice(tasks_iter, offset, offset + limit)))
 
 # 4. POST endpoint with Pydantic model
 @router.post("/tasks", response_model=Task, status_code=status.HTTP_201_CREATED, summary="Create new task")
 async def create_task(task: Task):
     """Create a new task."""
-    global task_counter
-    task_counter += 1
-    
-    new_task = Task(
-        id=task_counter,
+    # The input already passed validation; the record just copies the
+    # fields verbatim
+    new_task = TaskRecord(
+        id=next(_id_gen),
         title=task.title,
         description=task.description,
         completed=task.completed,
@@ -98,10 +183,11 @@ async def create_task(task: Task):
         created_at=datetime.now()
     )
     
-    tasks_db.append(new_task)
-    logger.info(f"Created task with ID: {task_counter}")
+    tasks_db[new_task.id] = new_task
+    _index_task(new_task)
+    logger.info("Created task with ID: %s", new_task.id)
     
-    return new_task
+    return ORJSONResponse(new_task, status_code=status.HTTP_201_CREATED)
 
 # 5. PUT endpoint for full updates
 @router.put("/tasks/{task_id}", response_model=Task, summary="Update entire task")
@@ -110,23 +196,30 @@ async def update_task(
     task_update: Task = Body(..., description="Updated task data")
 ):
     """Update an entire task."""
-    task_index = next((i for i, t in enumerate(tasks_db) if t.id == task_id), None)
+    original_task = tasks_db.get(task_id)
     
-    if task_index is None:
+    if original_task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
     
     # Keep original ID and created_at
-    original_task = tasks_db[task_index]
-    task_update.id = original_task.id
-    task_update.created_at = original_task.created_at
+    new_record = TaskRecord(
+        id=original_task.id,
+        title=task_update.title,
+        description=task_update.description,
+        completed=task_update.completed,
+        priority=task_update.priority,
+        created_at=original_task.created_at
+    )
     
-    tasks_db[task_index] = task_update
-    logger.info(f"Updated task with ID: {task_id}")
+    _unindex_task(original_task)
+    tasks_db[task_id] = new_record
+    _index_task(new_record)
+    logger.info("Updated task with ID: %s", task_id)
     
-    return task_update
+    return ORJSONResponse(new_record)
 
 # 6. PATCH endpoint for partial updates
 @router.patch("/tasks/{task_id}", response_model=Task, summary="Partially update task")
@@ -135,23 +228,25 @@ async def patch_task(
     task_update: TaskUpdate = Body(..., description="Partial task update data")
 ):
     """Partially update a task."""
-    task_index = next((i for i, t in enumerate(tasks_db) if t.id == task_id), None)
+    current_task = tasks_db.get(task_id)
     
-    if task_index is None:
+    if current_task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
     
-    # Update only provided fields
-    current_task = tasks_db[task_index]
+    # Update only provided fields; plain slot writes, re-bucketing if
+    # a filter field moved
     update_data = task_update.model_dump(exclude_unset=True)
     
+    _unindex_task(current_task)
     for field, value in update_data.items():
         setattr(current_task, field, value)
+    _index_task(current_task)
     
-    logger.info(f"Partially updated task with ID: {task_id}")
-    return current_task
+    logger.info("Partially updated task with ID: %s", task_id)
+    return ORJSONResponse(current_task)
 
 # 7. DELETE endpoint
 @router.delete("/tasks/{task_id}", summary="Delete task")
@@ -159,16 +254,16 @@ async def delete_task(
     task_id: int = Path(..., description="The ID of the task to delete", ge=1)
 ):
     """Delete a task."""
-    task_index = next((i for i, t in enumerate(tasks_db) if t.id == task_id), None)
+    deleted_task = tasks_db.pop(task_id, None)
     
-    if task_index is None:
+    if deleted_task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
     
-    deleted_task = tasks_db.pop(task_index)
-    logger.info(f"Deleted task with ID: {task_id}")
+    _unindex_task(deleted_task)
+    logger.info("Deleted task with ID: %s", task_id)
     
     return {"message": "Task deleted successfully", "deleted_task": deleted_task}
 
@@ -179,23 +274,26 @@ async def create_batch_tasks(
     notify: bool = Body(False, description="Whether to send notifications")
 ):
     """Create multiple tasks at once."""
-    global task_counter
     created_tasks = []
+    now = datetime.now()
     
+    # Inputs were validated on the way in; build plain records and
+    # insert the whole batch in one dict update
     for task in tasks:
-        task_counter += 1
-        new_task = Task(
-            id=task_counter,
+        created_tasks.append(TaskRecord(
+            id=next(_id_gen),
             title=task.title,
             description=task.description,
             completed=task.completed,
             priority=task.priority,
-            created_at=datetime.now()
-        )
-        tasks_db.append(new_task)
-        created_tasks.append(new_task)
+            created_at=now
+        ))
+    
+    tasks_db.update((t.id, t) for t in created_tasks)
+    for new_task in created_tasks:
+        _index_task(new_task)
     
-    logger.info(f"Created {len(created_tasks)} tasks in batch")
+    logger.info("Created %d tasks in batch", len(created_tasks))
     
     response = {
         "message": f"Created {len(created_tasks)} tasks successfully",
@@ -220,17 +318,30 @@ async def search_tasks(
         )
     
     results = []
-    query_lower = q.lower()
-    
-    for task in tasks_db:
-        match = False
-        if in_title and task.title and query_lower in task.title.lower():
-            match = True
-        if in_description and task.description and query_lower in task.description.lower():
-            match = True
-        
-        if match:
-            results.append(task)
+    pattern = _search_pattern(q)
+    search = pattern.search
+    
+    # Narrow to tasks containing every trigram of the query, then
+    # verify the actual substring only on those candidates. Queries
+    # shorter than a trigram fall back to the full scan.
+    q_lc = q.lower()
+    if len(q_lc) >= 3:
+        candidate_ids = None
+        for gram in _trigrams(q_lc):
+            posting = trigram_index.get(gram)
+            if not posting:
+                candidate_ids = set()
+                break
+            candidate_ids = set(posting) if candidate_ids is None else candidate_ids & posting
+        candidates = sorted(candidate_ids or ())
+    else:
+        candidates = list(search_index)
+    
+    for task_id in candidates:
+        title_lc, desc_lc = search_index[task_id]
+        if (in_title and search(title_lc)) or \
+                (in_description and desc_lc and search(desc_lc)):
+            results.append(tasks_db[task_id])
     
     if not results:
         return {
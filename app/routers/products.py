@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Dict, Any
+from itertools import count
 import logging
 
 from ..security import get_current_user
@@ -20,6 +21,16 @@ products_db = [
     {"id": 3, "name": "Book", "price": 24.99, "category": "Education"},
 ]
 
+# Parallel column of lowercased categories, maintained at write time,
+# so the filter loop compares precomputed strings instead of calling
+# .lower() per product per request
+_category_lc = {p["id"]: p["category"].lower() for p in products_db}
+
+# Id index for O(1) lookups, and a counter so creates don't rescan the
+# whole list for max(id)
+products_by_id: Dict[int, dict] = {p["id"]: p for p in products_db}
+_product_id_gen = count(max(products_by_id, default=0) + 1)
+
 @router.get("/", summary="Get all products")
 async def get_products(
     category: str = Query(None, description="Filter by category"),
@@ -28,16 +39,15 @@ async def get_products(
     current_user: dict = Depends(get_current_user)
 ):
     """Get all products with optional filtering."""
-    filtered_products = products_db.copy()
-    
-    if category:
-        filtered_products = [p for p in filtered_products if p["category"].lower() == category.lower()]
-    
-    if min_price is not None:
-        filtered_products = [p for p in filtered_products if p["price"] >= min_price]
-    
-    if max_price is not None:
-        filtered_products = [p for p in filtered_products if p["price"] <= max_price]
+    # All predicates in one pass: one list allocation instead of a
+    # copy plus a rebuild per active filter
+    category_lc = category.lower() if category else None
+    filtered_products = [
+        p for p in products_db
+        if (category_lc is None or _category_lc[p["id"]] == category_lc)
+        and (min_price is None or p["price"] >= min_price)
+        and (max_price is None or p["price"] <= max_price)
+    ]
     
     return {"products": filtered_products, "count": len(filtered_products)}
 
@@ -47,7 +57,7 @@ async def get_product(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific product by ID."""
-    product = next((p for p in products_db if p["id"] == product_id), None)
+    product = products_by_id.get(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -58,8 +68,7 @@ async def create_product(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new product."""
-    # Generate new ID
-    new_id = max([p["id"] for p in products_db], default=0) + 1
+    new_id = next(_product_id_gen)
     
     new_product = {
         "id": new_id,
@@ -69,7 +78,9 @@ async def create_product(
     }
     
     products_db.append(new_product)
-    logger.info(f"Created product with ID: {new_id}")
+    products_by_id[new_id] = new_product
+    _category_lc[new_id] = new_product["category"].lower()
+    logger.info("Created product with ID: %s", new_id)
     
     return new_product
 
@@ -80,18 +91,19 @@ async def update_product(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a product by ID."""
-    product_index = next((i for i, p in enumerate(products_db) if p["id"] == product_id), None)
+    product = products_by_id.get(product_id)
     
-    if product_index is None:
+    if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Update the product
     for key, value in updates.items():
         if key in ["name", "price", "category"]:
-            products_db[product_index][key] = value
+            product[key] = value
+    _category_lc[product_id] = product["category"].lower()
     
-    logger.info(f"Updated product with ID: {product_id}")
-    return products_db[product_index]
+    logger.info("Updated product with ID: %s", product_id)
+    return product
 
 @router.delete("/{product_id}", summary="Delete product by ID")
 async def delete_product(
@@ -99,12 +111,13 @@ async def delete_product(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a product by ID."""
-    product_index = next((i for i, p in enumerate(products_db) if p["id"] == product_id), None)
+    deleted_product = products_by_id.pop(product_id, None)
     
-    if product_index is None:
+    if deleted_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    deleted_product = products_db.pop(product_index)
-    logger.info(f"Deleted product with ID: {product_id}")
+    products_db.remove(deleted_product)
+    _category_lc.pop(product_id, None)
+    logger.info("Deleted product with ID: %s", product_id)
     
     return {"message": "Product deleted successfully", "deleted_product": deleted_product}
\ No newline at end of file
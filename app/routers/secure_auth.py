@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status, Response, Cookie
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 import logging
 
 from ..database import get_db
-from ..security import security_manager, get_current_user_session
+from ..security import security_manager, get_current_user_session, acached_verify_password, _DUMMY_HASH
 from ..db_session_store import session_store
 from .. import schemas, models, crud
 
 logger = logging.getLogger(__name__)
 
 # Create a specific dependency for endpoints that have path parameters
-async def get_current_user_for_session_ops(user_session_cookie: str = Cookie(None, alias="session_id"), db: Session = Depends(get_db)):
-    """Get current user from secure server-side session for session operations."""
+async def get_current_user_for_session_ops(request: Request, user_session_cookie: str = Cookie(None, alias="session_id"), db: Session = Depends(get_db)):
+    """Get current user from secure server-side session for session operations.
+
+    Memoized on request.state alongside get_current_user_session, so a
+    request passing through both dependencies does one lookup.
+    """
+    cached = getattr(request.state, "session_user", None)
+    if cached is not None:
+        return cached
+
     if not user_session_cookie:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,11 +35,13 @@ async def get_current_user_for_session_ops(user_session_cookie: str = Cookie(Non
             detail="Invalid or expired session. Please login again.",
         )
     
-    return {
+    user = {
         "email": session_data["user_email"],
         "session_id": user_session_cookie,
         "session_data": session_data
     }
+    request.state.session_user = user
+    return user
 
 # Create router
 router = APIRouter(
@@ -52,16 +63,20 @@ async def secure_login(
 ):
     """Authenticate user and create secure server-side session."""
     try:
-        # Find user by email
+        # Find user by email (indexed lookup), then always verify one
+        # hash: the dummy hash for unknown emails keeps the latency of
+        # both failure branches identical, so timing doesn't reveal
+        # whether an account exists
         user = crud.crud.get_user_by_email(db, email=user_credentials.email)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password",
-            )
+        pw_hash = user.password_hash if user else _DUMMY_HASH
         
-        # Verify password
-        if not security_manager.verify_password(user_credentials.password, user.password_hash):
+        # Verify on the bounded Argon2 pool; the short-TTL memo means a
+        # storm of identical attempts costs one Argon2 run instead of
+        # one per request
+        password_ok = await acached_verify_password(
+            user_credentials.email, user_credentials.password, pw_hash
+        )
+        if not user or not password_ok:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
@@ -80,7 +95,7 @@ async def secure_login(
             samesite="lax"  # CSRF protection
         )
         
-        logger.info(f"Secure session created for user: {user.email}")
+        logger.info("Secure session created for user: %s", user.email)
         
         return {
             "message": "Login successful",
@@ -94,7 +109,7 @@ async def secure_login(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error during secure login: {e}")
+        logger.error("Error during secure login: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during login"
@@ -120,12 +135,12 @@ async def secure_logout(
         # Clear the cookie
         response.delete_cookie(key="session_id")
         
-        logger.info(f"User logged out: {current_user_data['email']}")
+        logger.info("User logged out: %s", current_user_data["email"])
         
         return {"message": "Logout successful"}
         
     except Exception as e:
-        logger.error(f"Error during logout: {e}")
+        logger.error("Error during logout: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during logout"
@@ -155,39 +170,7 @@ async def get_current_user_info_secure(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting current user: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
-
-@router.post(
-    "/extend-session",
-    summary="Extend session",
-    description="Extend the current session expiration time."
-)
-async def extend_session(
-    current_user_data: dict = Depends(get_current_user_session)
-):
-    """Extend the current session expiration time."""
-    try:
-        session_id = current_user_data.get("session_id")
-        
-        if security_manager.extend_session(session_id):
-            return {
-                "message": "Session extended successfully",
-                "new_expires_in": 1800  # 30 more minutes
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not extend session"
-            )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error extending session: {e}")
+        logger.error("Error getting current user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -212,7 +195,7 @@ async def get_user_sessions(
         }
         
     except Exception as e:
-        logger.error(f"Error getting user sessions: {e}")
+        logger.error("Error getting user sessions: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -230,20 +213,6 @@ async def terminate_session(
 ):
     """Terminate a specific session by ID."""
     try:
-        # Verify the session belongs to the current user
-        user_sessions = session_store.get_user_sessions(current_user_data["email"], db=db)
-        target_session = None
-        for session in user_sessions:
-            if session["session_id"] == session_id:
-                target_session = session
-                break
-        
-        if not target_session:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found or doesn't belong to you"
-            )
-        
         # Don't allow terminating current session via this endpoint
         if session_id == current_user_data["session_id"]:
             raise HTTPException(
@@ -251,11 +220,19 @@ async def terminate_session(
                 detail="Cannot terminate current session. Use logout instead."
             )
         
+        # Ownership check as one indexed row instead of loading and
+        # scanning every session the user has
+        if not session_store.owns_session(current_user_data["email"], session_id, db=db):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found or doesn't belong to you"
+            )
+        
         # Terminate the session
         success = security_manager.delete_session(session_id, db=db)
         
         if success:
-            logger.info(f"Session {session_id} terminated by user {current_user_data['email']}")
+            logger.info("Session %s terminated by user %s", session_id, current_user_data["email"])
             return {"message": "Session terminated successfully"}
         else:
             raise HTTPException(
@@ -266,7 +243,7 @@ async def terminate_session(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error terminating session: {e}")
+        logger.error("Error terminating session: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -292,7 +269,7 @@ async def logout_all_devices(
         # Clear the cookie
         response.delete_cookie(key="session_id")
         
-        logger.info(f"User {user_email} logged out from all devices ({terminated_count} sessions terminated)")
+        logger.info("User %s logged out from all devices (%d sessions terminated)", user_email, terminated_count)
         
         return {
             "message": f"Successfully logged out from all devices",
@@ -300,7 +277,7 @@ async def logout_all_devices(
         }
         
     except Exception as e:
-        logger.error(f"Error during logout from all devices: {e}")
+        logger.error("Error during logout from all devices: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during logout"
@@ -312,14 +289,14 @@ async def logout_all_devices(
     description="Extend the expiration time of the current session."
 )
 async def extend_current_session(
-    extend_data: dict,
+    extend_data: Optional[dict] = Body(None),
     current_user_data: dict = Depends(get_current_user_session),
     db: Session = Depends(get_db)
 ):
     """Extend the current session expiration time."""
     try:
         session_id = current_user_data["session_id"]
-        minutes = extend_data.get("minutes", 30)
+        minutes = (extend_data or {}).get("minutes", 30)
         
         # Validate minutes (between 5 and 480 minutes = 8 hours max)
         if not isinstance(minutes, int) or minutes < 5 or minutes > 480:
@@ -332,7 +309,7 @@ async def extend_current_session(
         success = security_manager.extend_session(session_id, minutes, db=db)
         
         if success:
-            logger.info(f"Session {session_id} extended by {minutes} minutes for user {current_user_data['email']}")
+            logger.info("Session %s extended by %d minutes for user %s", session_id, minutes, current_user_data["email"])
             return {
                 "message": f"Session extended by {minutes} minutes",
                 "extended_minutes": minutes
@@ -346,7 +323,7 @@ async def extend_current_session(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error extending session: {e}")
+        logger.error("Error extending session: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import Dict, List, Tuple
+import hashlib
 import logging
+import threading
+import time
 
 from ..database import get_db
 from ..security import get_current_user
-from ..crud import crud
-from .. import schemas, models
+from ..crud import _SUMMARY_ORDER_COLUMNS, crud
+from .. import schemas
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +19,63 @@ logger = logging.getLogger(__name__)
 router = APIRouter(
     prefix="/users",
     tags=["users"],
+    # orjson renders every response on this router; the stock JSONResponse
+    # would run json.dumps over a jsonable_encoder pass per call
+    default_response_class=ORJSONResponse,
     responses={404: {"model": schemas.ErrorResponse}},
 )
 
+# Short-TTL cache of the list endpoint, keyed by the paging/ordering
+# query params. The list is identical for every authenticated caller,
+# so hot polling stops hitting the database; any write through this
+# router clears the whole cache rather than tracking which pages a
+# change lands on. Size-capped like the token and verify caches —
+# skip is unbounded and each entry holds a full page body, so an
+# uncapped dict would let a client iterating skip grow it without
+# limit; expired entries are pruned whenever a miss rebuilds a page.
+# The handlers here are sync def, so they run on the threadpool and
+# every access goes through the lock, as with the security.py caches.
+_LIST_CACHE_TTL = 60
+_LIST_CACHE_MAX = 128
+_list_cache: Dict[Tuple[int, int, str, bool], tuple] = {}
+_list_cache_lock = threading.Lock()
+
+def _invalidate_list_cache() -> None:
+    """Drop all cached list pages after a user write."""
+    with _list_cache_lock:
+        _list_cache.clear()
+
+# Prebuilt exceptions for the hot error paths: under scanning load the
+# 404/400 branches fire more often than the success path, and raising a
+# shared instance skips the per-request allocation. The not-found detail
+# is deliberately static — no echoing client-supplied IDs back.
+_E_USER_NOT_FOUND = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+)
+_E_EMAIL_TAKEN = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+)
+
+def _make_etag(*parts) -> str:
+    """Build a weak-ish ETag from cheap change markers.
+
+    Hashing updated_at timestamps and counts instead of rendered bodies
+    means a 304 costs one digest over a few dozen bytes; blake2b is the
+    fastest hash in the stdlib, so no extra dependency is needed.
+    """
+    digest = hashlib.blake2b(
+        ":".join(str(p) for p in parts).encode(), digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
 @router.get(
     "/",
     response_model=schemas.UserSummaryList,
     summary="Get all users",
     description="Retrieve a list of all users with basic info (id, name, email) and optional pagination. Requires authentication."
 )
-async def get_users(
+def get_users(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of users to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of users to return"),
     order_by: str = Query("id", description="Field to order by: id, name, email, created_at"),
@@ -34,26 +85,61 @@ async def get_users(
 ):
     """Get all users with pagination and ordering."""
     try:
-        # Build query with ordering
-        query = db.query(models.User)
-        
-        # Add ordering
-        if order_by and hasattr(models.User, order_by):
-            order_field = getattr(models.User, order_by)
-            if order_direction.lower() == "desc":
-                query = query.order_by(order_field.desc())
-            else:
-                query = query.order_by(order_field.asc())
+        descending = order_direction.lower() == "desc"
+        # Canonicalize through the sortable-column allowlist before
+        # keying: every unknown order_by sorts by id anyway, so garbage
+        # values all share the id slot instead of each minting their own
+        order_key = order_by if order_by in _SUMMARY_ORDER_COLUMNS else "id"
+        cache_key = (skip, limit, order_key, descending)
+        now = time.monotonic()
+        with _list_cache_lock:
+            hit = _list_cache.get(cache_key)
+            if hit is not None and hit[0] <= now:
+                hit = None
+            if hit is None:
+                # Miss: prune entries whose TTL has lapsed so only live
+                # pages count against the cap
+                for dead in [k for k, v in _list_cache.items() if v[0] <= now]:
+                    _list_cache.pop(dead, None)
+        if hit is not None:
+            body, etag = hit[1], hit[2]
         else:
-            query = query.order_by(models.User.id.asc())
-        
-        # Apply pagination
-        users = query.offset(skip).limit(limit).all()
-        total = db.query(models.User).count()
-        
-        return schemas.UserSummaryList(users=users, total=total)
-    except Exception as e:
-        logger.error(f"Error retrieving users: {e}")
+            # Column projection: only the summary fields leave the
+            # database; the total rides along as a window function on
+            # the same query
+            users, total = crud.get_users_summary(
+                db,
+                skip=skip,
+                limit=limit,
+                order_by=order_key,
+                descending=descending,
+            )
+            # Validate and dump the whole page in two batch calls, then
+            # hand the plain dict to orjson — no per-row Python loop and
+            # no response_model re-validation (the decorator's model is
+            # kept for the OpenAPI schema)
+            page = schemas.USER_SUMMARY_LIST_ADAPTER.validate_python(
+                users, from_attributes=True
+            )
+            body = {
+                "users": schemas.USER_SUMMARY_LIST_ADAPTER.dump_python(page, mode="json"),
+                "total": total,
+            }
+            max_updated = max((u.updated_at for u in users if u.updated_at), default=None)
+            etag = _make_etag(total, max_updated, skip, limit, order_key, descending)
+            with _list_cache_lock:
+                if len(_list_cache) >= _LIST_CACHE_MAX:
+                    # Bounded cache: entries are worth at most a minute
+                    # of saved queries, so dropping everything is fine
+                    _list_cache.clear()
+                _list_cache[cache_key] = (now + _LIST_CACHE_TTL, body, etag)
+
+        # A matching ETag skips both serialization and the body bytes
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return ORJSONResponse(body, headers={"ETag": etag})
+    except Exception:
+        logger.error("Error retrieving users", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while retrieving users"
@@ -65,8 +151,10 @@ async def get_users(
     summary="Get user by ID",
     description="Retrieve a specific user by their ID. Requires authentication."
 )
-async def get_user(
-    user_id: int, 
+def get_user(
+    request: Request,
+    response: Response,
+    user_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -74,15 +162,16 @@ async def get_user(
     try:
         user = crud.get_user(db, user_id=user_id)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with id {user_id} not found"
-            )
+            raise _E_USER_NOT_FOUND
+        etag = _make_etag(user.id, user.updated_at)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return user
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error retrieving user {user_id}: {e}")
+    except Exception:
+        logger.error("Error retrieving user %s", user_id, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while retrieving user"
@@ -95,31 +184,26 @@ async def get_user(
     summary="Create a new user",
     description="Create a new user with the provided information. Requires authentication."
 )
-async def create_user(
+def create_user(
     user: schemas.UserCreate, 
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new user."""
     try:
-        # Check if user with email already exists
-        existing_user = crud.get_user_by_email(db, email=user.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        return crud.create_user(db=db, user=user)
+        # Atomic insert: a duplicate email comes back as None, so no
+        # pre-check SELECT and no window for a concurrent registration
+        created = crud.create_user(db=db, user=user)
+        if created is None:
+            raise _E_EMAIL_TAKEN
+        _invalidate_list_cache()
+        return created
     except HTTPException:
         raise
     except IntegrityError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    except Exception as e:
-        logger.error(f"Error creating user: {e}")
+        raise _E_EMAIL_TAKEN
+    except Exception:
+        logger.error("Error creating user", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while creating user"
@@ -131,7 +215,7 @@ async def create_user(
     summary="Update user by ID",
     description="Update a user's information by their ID. Requires authentication."
 )
-async def update_user(
+def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
     db: Session = Depends(get_db),
@@ -139,34 +223,20 @@ async def update_user(
 ):
     """Update a user by ID."""
     try:
-        # Check if user exists
-        existing_user = crud.get_user(db, user_id=user_id)
-        if not existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with id {user_id} not found"
-            )
-        
-        # Check if email is being updated and already exists for another user
-        if user_update.email:
-            email_user = crud.get_user_by_email(db, email=user_update.email)
-            if email_user and email_user.id != user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-        
+        # One UPDATE ... RETURNING covers both checks: a missing user
+        # comes back as None, and a taken email raises IntegrityError
+        # via the unique index — no pre-check SELECTs
         updated_user = crud.update_user(db=db, user_id=user_id, user_update=user_update)
+        if updated_user is None:
+            raise _E_USER_NOT_FOUND
+        _invalidate_list_cache()
         return updated_user
     except HTTPException:
         raise
     except IntegrityError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    except Exception as e:
-        logger.error(f"Error updating user {user_id}: {e}")
+        raise _E_EMAIL_TAKEN
+    except Exception:
+        logger.error("Error updating user %s", user_id, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while updating user"
@@ -177,26 +247,21 @@ async def update_user(
     summary="Delete user by ID",
     description="Delete a user by their ID. Requires authentication."
 )
-async def delete_user(
+def delete_user(
     user_id: int, 
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a user by ID."""
     try:
-        # Check if user exists
-        existing_user = crud.get_user(db, user_id=user_id)
-        if not existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with id {user_id} not found"
-            )
-
-        crud.delete_user(db=db, user_id=user_id)
+        # Single DELETE ... RETURNING; False means nothing matched
+        if not crud.delete_user(db=db, user_id=user_id):
+            raise _E_USER_NOT_FOUND
+        _invalidate_list_cache()
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error deleting user {user_id}: {e}")
+    except Exception:
+        logger.error("Error deleting user %s", user_id, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while deleting user"
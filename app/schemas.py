@@ -1,6 +1,21 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator
 from typing import Optional
 from datetime import datetime
+import re
+
+# Compiled once: rejects obviously malformed addresses before any
+# database work, and the lowercase normalization keeps the unique email
+# index from admitting case-variant duplicates
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _normalize_email(value: Optional[str]) -> Optional[str]:
+    """Strip, lowercase and shape-check an email address."""
+    if value is None:
+        return value
+    value = value.strip().lower()
+    if not _EMAIL_RE.match(value):
+        raise ValueError("Invalid email address")
+    return value
 
 class UserBase(BaseModel):
     """Base user schema with common fields."""
@@ -9,6 +24,8 @@ class UserBase(BaseModel):
     age: Optional[int] = Field(None, ge=0, le=150, description="User's age")
     bio: Optional[str] = Field(None, max_length=1000, description="User's biography")
 
+    _validate_email = field_validator("email")(_normalize_email)
+
 class UserCreate(UserBase):
     """Schema for creating a new user."""
     pass
@@ -20,6 +37,8 @@ class UserUpdate(BaseModel):
     age: Optional[int] = Field(None, ge=0, le=150, description="User's age")
     bio: Optional[str] = Field(None, max_length=1000, description="User's biography")
 
+    _validate_email = field_validator("email")(_normalize_email)
+
 class User(UserBase):
     """Schema for returning user data."""
     model_config = ConfigDict(from_attributes=True)
@@ -50,9 +69,14 @@ class UserSummaryList(BaseModel):
     """Schema for returning a list of basic user data."""
     users: list[UserSummary]
 
-    
+
     total: int = Field(..., description="Total number of users")
 
+# Prebuilt batch adapter for the list endpoint: validating and dumping
+# the whole page in two Rust calls avoids Python-level per-row model
+# construction and serialization dispatch.
+USER_SUMMARY_LIST_ADAPTER = TypeAdapter(list[UserSummary])
+
 
 class UserCreateResponse(BaseModel):
     """Schema for user creation response with custom field order."""
@@ -77,6 +101,8 @@ class UserLogin(BaseModel):
     email: str = Field(..., description="User's email address")
     password: str = Field(..., min_length=1, description="User's password")
 
+    _validate_email = field_validator("email")(_normalize_email)
+
 class UserRegister(BaseModel):
     """Schema for user registration."""
     name: str = Field(..., min_length=1, max_length=100, description="User's full name")
@@ -85,6 +111,24 @@ class UserRegister(BaseModel):
     age: Optional[int] = Field(None, ge=0, le=150, description="User's age")
     bio: Optional[str] = Field(None, max_length=1000, description="User's biography")
 
+    _validate_email = field_validator("email")(_normalize_email)
+
+class PasswordChangeRequest(BaseModel):
+    """Schema for changing the current user's password."""
+    old_password: str = Field(..., min_length=1, description="Current password")
+    new_password: str = Field(..., min_length=8, description="New password (minimum 8 characters)")
+
+class UserClaims(BaseModel):
+    """Schema for profile data carried in JWT claims (no bio/timestamps)."""
+    id: int = Field(..., description="User's unique identifier")
+    name: str = Field(..., description="User's full name")
+    email: str = Field(..., description="User's email address")
+    age: Optional[int] = Field(None, description="User's age")
+
+class EmailBatchRequest(BaseModel):
+    """Schema for batched user lookups by email."""
+    emails: list[str] = Field(..., max_length=100, description="Emails to resolve")
+
 class Token(BaseModel):
     """Schema for JWT token response."""
     access_token: str = Field(..., description="JWT access token")
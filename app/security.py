@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
+import asyncio
 import hashlib
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status, Cookie, Header
+from fastapi import Depends, HTTPException, Request, status, Cookie, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import os
@@ -19,12 +24,99 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing with Argon2 (no length limits, most secure)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Password hashing with Argon2 (no length limits, most secure).
+# Parameters pinned to the OWASP-recommended argon2id profile: 19 MiB
+# memory cost keeps per-hash wall clock ~constant while staying cache
+# friendly under concurrent logins.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
+
+# Dedicated pool for password hashing, sized to the CPU cores Argon2
+# can actually use. The semaphore keeps a login storm from queueing
+# unbounded hashing work and starving the shared request threadpool;
+# excess attempts wait in the event loop instead.
+_HASH_WORKERS = os.cpu_count() or 4
+_hash_pool = ThreadPoolExecutor(max_workers=_HASH_WORKERS, thread_name_prefix="argon2")
+_hash_sem = asyncio.Semaphore(_HASH_WORKERS)
+
+async def _run_hashing(fn, *args):
+    """Run a hashing function on the bounded Argon2 pool."""
+    async with _hash_sem:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+
+# Fixed-cost hash verified for unknown emails so login latency doesn't
+# reveal whether an account exists. Computing it at import also warms
+# argon2-cffi's lazy C-extension load and passlib's handler setup, and
+# the verify below primes the verification path, so the first real
+# login doesn't pay one-time initialization cost.
+_DUMMY_HASH = pwd_context.hash(secrets.token_urlsafe(32))
+pwd_context.verify("warmup", _DUMMY_HASH)
 
 # Token scheme
 security = HTTPBearer()
 
+# Memo of decoded JWT payloads keyed by the raw token string. Safe
+# because identical signed tokens always carry identical claims; the
+# deadline is capped at the token's exp so a cached entry can never
+# outlive the token itself.
+_TOKEN_CACHE_TTL = 30
+_TOKEN_CACHE_MAX = 4096
+_token_cache: dict = {}
+_token_cache_lock = threading.Lock()
+
+# Short-TTL memo of recent verification results. Argon2 deliberately
+# costs ~100 ms per call; retry storms and SPA revalidation re-submit
+# identical credentials within seconds, so remembering the outcome for
+# a minute removes almost all repeat hashing. Keys carry a keyed
+# blake2b digest of the password, never the plaintext, and the MAC key
+# is per-process and never persisted.
+_VERIFY_CACHE_TTL = 60
+_VERIFY_CACHE_MAX = 10_000
+_verify_cache: dict = {}
+_verify_cache_lock = threading.Lock()
+_verify_digest_key = secrets.token_bytes(32)
+
+def cached_verify_password(email: str, plain_password: str, hashed_password: str) -> bool:
+    """Verify a password, memoizing the result for a short TTL.
+
+    Args:
+        email: Account the attempt is for (part of the cache key)
+        plain_password: Candidate password
+        hashed_password: Stored Argon2 hash
+
+    Returns:
+        True if the password matches
+    """
+    digest = hashlib.blake2b(
+        plain_password.encode(), key=_verify_digest_key, digest_size=16
+    ).digest()
+    key = (email, digest, hashed_password[:8])
+    now = time.monotonic()
+
+    with _verify_cache_lock:
+        hit = _verify_cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+    result = pwd_context.verify(plain_password, hashed_password)
+
+    with _verify_cache_lock:
+        if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+            # Bounded cache: dropping everything is fine, entries are
+            # worth at most one minute of saved hashing
+            _verify_cache.clear()
+        _verify_cache[key] = (now + _VERIFY_CACHE_TTL, result)
+    return result
+
+async def acached_verify_password(email: str, plain_password: str, hashed_password: str) -> bool:
+    """Async wrapper over cached_verify_password on the bounded pool."""
+    return await _run_hashing(cached_verify_password, email, plain_password, hashed_password)
+
 class SecurityManager:
     """Handles authentication and authorization."""
     
@@ -39,42 +131,45 @@ class SecurityManager:
         return pwd_context.hash(password)
     
     @staticmethod
-    def create_session(user_email: str, db: Session = None) -> str:
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the bounded Argon2 pool."""
+        return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+    
+    @staticmethod
+    async def aget_password_hash(password: str) -> str:
+        """Hash a password on the bounded Argon2 pool."""
+        return await _run_hashing(pwd_context.hash, password)
+    
+    @staticmethod
+    def create_session(user_email: str, *, db: Session) -> str:
         """Create a secure server-side session in database."""
         return session_store.create_session(user_email, expires_in_minutes=ACCESS_TOKEN_EXPIRE_MINUTES, db=db)
     
     @staticmethod
-    def get_session_data(session_id: str, db: Session = None) -> Optional[dict]:
+    def get_session_data(session_id: str, *, db: Session) -> Optional[dict]:
         """Get session data from database."""
         return session_store.get_session(session_id, db=db)
     
     @staticmethod
-    def delete_session(session_id: str, db: Session = None) -> bool:
+    def delete_session(session_id: str, *, db: Session) -> bool:
         """Delete session from database."""
         return session_store.delete_session(session_id, db=db)
     
     @staticmethod
-    def extend_session(session_id: str, minutes: int = 30, db: Session = None) -> bool:
+    def extend_session(session_id: str, minutes: int = 30, *, db: Session) -> bool:
         """Extend session expiration time."""
         return session_store.extend_session(session_id, minutes, db=db)
     
     @staticmethod
-    def get_user_sessions(user_email: str, db: Session = None) -> list:
+    def get_user_sessions(user_email: str, *, db: Session) -> list:
         """Get all active sessions for a user."""
         return session_store.get_user_sessions(user_email, db=db)
     
     @staticmethod
-    def delete_all_user_sessions(user_email: str, db: Session = None) -> int:
+    def delete_all_user_sessions(user_email: str, *, db: Session) -> int:
         """Delete all sessions for a user (logout from all devices)."""
         return session_store.delete_all_user_sessions(user_email, db=db)
-        """Delete a session from server-side store."""
-        return session_store.delete_session(session_id)
-    
-    @staticmethod
-    def extend_session(session_id: str) -> bool:
-        """Extend session expiration."""
-        return session_store.extend_session(session_id)
-    
+
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         """Create a JWT access token."""
@@ -90,13 +185,42 @@ class SecurityManager:
     
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
-        """Verify and decode a JWT token."""
+        """Verify and decode a JWT token.
+
+        Decoded payloads are memoized by the raw token string: a signed
+        token always decodes to the same claims, so repeat requests from
+        the same client skip the base64 + JSON + HMAC work. Entries live
+        at most _TOKEN_CACHE_TTL seconds and never past the token's own
+        exp, so expiry is still enforced.
+        """
+        now = time.time()
+        with _token_cache_lock:
+            hit = _token_cache.get(token)
+            if hit is not None and hit[0] > now:
+                return dict(hit[1])
+
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             user_email: str = payload.get("sub")
             if user_email is None:
                 return None
-            return {"email": user_email, "exp": payload.get("exp")}
+            data = {"email": user_email, "exp": payload.get("exp")}
+            # Profile claims added at login let /me answer without a
+            # database round trip; absent on older tokens
+            for claim in ("uid", "name", "age"):
+                if claim in payload:
+                    data[claim] = payload[claim]
+
+            exp = payload.get("exp")
+            deadline = now + _TOKEN_CACHE_TTL
+            if exp is not None:
+                deadline = min(deadline, float(exp))
+            if deadline > now:
+                with _token_cache_lock:
+                    if len(_token_cache) >= _TOKEN_CACHE_MAX:
+                        _token_cache.clear()
+                    _token_cache[token] = (deadline, data)
+            return dict(data)
         except JWTError:
             return None
 
@@ -118,16 +242,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         user_email = payload.get("email")
         if user_email is None:
             raise credentials_exception
-            
-        # Here you would typically fetch the user from database
-        # For now, we'll return the email
-        return {"email": user_email}
+
+        # Pass the token claims through; routes can usually answer from
+        # these without touching the database
+        return payload
         
     except Exception:
         raise credentials_exception
 
 # Dependency to get current user from secure server-side session
 async def get_current_user_session(
+    request: Request,
     session_cookie: str = Cookie(None, alias="session_id"), 
     session_header: str = Header(None, alias="X-Session-ID"),
     db: Session = Depends(get_db)
@@ -136,7 +261,13 @@ async def get_current_user_session(
     
     Supports both cookie-based authentication (for web browsers) and 
     header-based authentication (for API testing in Swagger UI).
+    The resolved user is memoized on request.state so other
+    dependencies in the same request reuse the lookup.
     """
+    cached = getattr(request.state, "session_user", None)
+    if cached is not None:
+        return cached
+
     # Try to get session ID from either cookie or header
     session_id = session_cookie or session_header
     
@@ -153,11 +284,13 @@ async def get_current_user_session(
             detail="Invalid or expired session. Please login again.",
         )
     
-    return {
+    user = {
         "email": session_data["user_email"],
         "session_id": session_id,
         "session_data": session_data
     }
+    request.state.session_user = user
+    return user
 
 # Optional: Dependency for admin users
 async def get_admin_user(current_user: dict = Depends(get_current_user)):
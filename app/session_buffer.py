@@ -0,0 +1,74 @@
+"""
+Write-behind buffering for session last-accessed timestamps.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import bindparam, update
+from starlette.concurrency import run_in_threadpool
+
+from .database import SessionLocal
+from .models import Session
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5.0  # seconds between batched flushes
+
+# session_id -> last-seen epoch seconds. Re-touching the same session
+# just overwrites its entry, so N hits within a flush window collapse
+# into one row of the batched UPDATE.
+_pending: Dict[str, float] = {}
+
+
+def touch(session_id: str) -> None:
+    """Record that a session was just used; persisted on the next flush."""
+    _pending[session_id] = time.time()
+
+
+def _drain() -> Dict[str, float]:
+    """Atomically take the buffered touches, leaving an empty buffer."""
+    global _pending
+    snapshot, _pending = _pending, {}
+    return snapshot
+
+
+def _flush_sync(snapshot: Dict[str, float]) -> None:
+    """Persist a snapshot of touches as one batched UPDATE."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Session)
+            .where(Session.session_id == bindparam("sid"))
+            .values(last_accessed=bindparam("ts")),
+            [
+                {"sid": sid, "ts": datetime.fromtimestamp(ts, timezone.utc)}
+                for sid, ts in snapshot.items()
+            ],
+        )
+        db.commit()
+        logger.debug("Flushed %d session touches", len(snapshot))
+    finally:
+        db.close()
+
+
+async def flush() -> None:
+    """Flush any buffered touches to the database."""
+    snapshot = _drain()
+    if not snapshot:
+        return
+    try:
+        await run_in_threadpool(_flush_sync, snapshot)
+    except Exception:
+        # Touch data is best-effort; losing a batch only makes
+        # last_accessed slightly stale
+        logger.error("Failed to flush session touches", exc_info=True)
+
+
+async def run_flusher() -> None:
+    """Background loop flushing the buffer every FLUSH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        await flush()
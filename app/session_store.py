@@ -1,10 +1,12 @@
 """
 Server-side session storage for secure token management.
 """
-import uuid
+import heapq
+import secrets
 import time
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,22 +17,40 @@ class SessionStore:
     def __init__(self):
         # In production, use Redis, database, or other persistent storage
         self._sessions: Dict[str, Dict] = {}
+        # Min-heap of (expires_at, session_id) so cleanup pops only the
+        # entries that actually expired instead of scanning every
+        # session. Extensions push a fresh entry; the stale one is
+        # recognized and skipped when it surfaces.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Inverted index so per-user operations (list sessions, global
+        # logout) touch only that user's sessions instead of scanning
+        # the whole store
+        self._by_user: Dict[str, Set[str]] = defaultdict(set)
         self._cleanup_interval = 300  # 5 minutes
         self._last_cleanup = time.time()
     
     def create_session(self, user_email: str, expires_in_minutes: int = 30) -> str:
         """Create a new session and return session ID."""
-        session_id = str(uuid.uuid4())
-        expires_at = datetime.now() + timedelta(minutes=expires_in_minutes)
-        
+        # Same ID scheme as the database-backed store: one urandom read
+        # and a base64 encode, shorter than a formatted UUID and with
+        # more entropy (192 bits vs UUID4's 122)
+        session_id = secrets.token_urlsafe(24)
+        # Timestamps are stored as plain epoch floats; expiry checks are
+        # then a single float comparison with no datetime allocation.
+        # Conversion back to datetime happens only at the API boundary.
+        now = time.time()
+        expires_at = now + expires_in_minutes * 60
+
         self._sessions[session_id] = {
             "user_email": user_email,
-            "created_at": datetime.now(),
+            "created_at": now,
             "expires_at": expires_at,
-            "last_accessed": datetime.now()
+            "last_accessed": now
         }
-        
-        logger.info(f"Created session {session_id} for user {user_email}")
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+        self._by_user[user_email].add(session_id)
+
+        logger.info("Created session %s for user %s", session_id, user_email)
         self._cleanup_expired_sessions()
         return session_id
     
@@ -40,15 +60,16 @@ class SessionStore:
             return None
         
         session = self._sessions[session_id]
-        
-        # Check if session is expired
-        if datetime.now() > session["expires_at"]:
+
+        # Check if session is expired: one float comparison
+        now = time.time()
+        if now > session["expires_at"]:
             self.delete_session(session_id)
             return None
-        
+
         # Update last accessed time
-        session["last_accessed"] = datetime.now()
-        
+        session["last_accessed"] = now
+
         return session
     
     def delete_session(self, session_id: str) -> bool:
@@ -56,21 +77,27 @@ class SessionStore:
         if session_id in self._sessions:
             user_email = self._sessions[session_id].get("user_email", "unknown")
             del self._sessions[session_id]
-            logger.info(f"Deleted session {session_id} for user {user_email}")
+            self._discard_from_index(user_email, session_id)
+            logger.info("Deleted session %s for user %s", session_id, user_email)
             return True
         return False
+
+    def _discard_from_index(self, user_email: str, session_id: str) -> None:
+        """Remove a session from the per-user index, dropping empty buckets."""
+        bucket = self._by_user.get(user_email)
+        if bucket is not None:
+            bucket.discard(session_id)
+            if not bucket:
+                del self._by_user[user_email]
     
     def delete_user_sessions(self, user_email: str) -> int:
         """Delete all sessions for a specific user."""
-        sessions_to_delete = [
-            sid for sid, session in self._sessions.items()
-            if session.get("user_email") == user_email
-        ]
-        
+        # The index hands us exactly this user's sessions; no full scan
+        sessions_to_delete = self._by_user.pop(user_email, set())
         for session_id in sessions_to_delete:
-            del self._sessions[session_id]
-        
-        logger.info(f"Deleted {len(sessions_to_delete)} sessions for user {user_email}")
+            self._sessions.pop(session_id, None)
+
+        logger.info("Deleted %d sessions for user %s", len(sessions_to_delete), user_email)
         return len(sessions_to_delete)
     
     def extend_session(self, session_id: str, additional_minutes: int = 30) -> bool:
@@ -79,9 +106,13 @@ class SessionStore:
             return False
         
         session = self._sessions[session_id]
-        session["expires_at"] = datetime.now() + timedelta(minutes=additional_minutes)
-        session["last_accessed"] = datetime.now()
-        
+        now = time.time()
+        session["expires_at"] = now + additional_minutes * 60
+        session["last_accessed"] = now
+        # The old heap entry becomes stale; cleanup skips it because its
+        # timestamp no longer matches the session's expires_at
+        heapq.heappush(self._expiry_heap, (session["expires_at"], session_id))
+
         return True
     
     def _cleanup_expired_sessions(self):
@@ -92,20 +123,28 @@ class SessionStore:
         if current_time - self._last_cleanup < self._cleanup_interval:
             return
         
-        now = datetime.now()
-        expired_sessions = [
-            sid for sid, session in self._sessions.items()
-            if now > session["expires_at"]
-        ]
-        
-        for session_id in expired_sessions:
-            user_email = self._sessions[session_id].get("user_email", "unknown")
+        # Pop only the truly-expired entries at the front of the heap:
+        # work scales with the number of expirations, not with the
+        # total session count
+        now = current_time
+        cleaned = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, session_id = heapq.heappop(heap)
+            session = self._sessions.get(session_id)
+            if session is None or session["expires_at"] != expires_at:
+                # Already deleted, or extended (a fresh heap entry
+                # exists for the new expiry)
+                continue
+            user_email = session.get("user_email", "unknown")
             del self._sessions[session_id]
-            logger.debug(f"Cleaned up expired session {session_id} for user {user_email}")
-        
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
-        
+            self._discard_from_index(user_email, session_id)
+            cleaned += 1
+            logger.debug("Cleaned up expired session %s for user %s", session_id, user_email)
+
+        if cleaned:
+            logger.info("Cleaned up %d expired sessions", cleaned)
+
         self._last_cleanup = current_time
     
     def get_session_count(self) -> int:
@@ -115,16 +154,20 @@ class SessionStore:
     
     def get_user_sessions(self, user_email: str) -> list:
         """Get all active sessions for a user."""
-        return [
-            {
+        now = time.time()
+        result = []
+        for sid in self._by_user.get(user_email, ()):
+            session = self._sessions.get(sid)
+            if session is None or now > session["expires_at"]:
+                continue
+            # Callers get datetimes; floats stay an internal detail
+            result.append({
                 "session_id": sid,
-                "created_at": session["created_at"],
-                "last_accessed": session["last_accessed"],
-                "expires_at": session["expires_at"]
-            }
-            for sid, session in self._sessions.items()
-            if session.get("user_email") == user_email and datetime.now() <= session["expires_at"]
-        ]
+                "created_at": datetime.fromtimestamp(session["created_at"]),
+                "last_accessed": datetime.fromtimestamp(session["last_accessed"]),
+                "expires_at": datetime.fromtimestamp(session["expires_at"])
+            })
+        return result
 
 # Global session store instance
 session_store = SessionStore()
\ No newline at end of file
@@ -0,0 +1,590 @@
+let currentToken = '';
+
+// Check for existing session on page load
+window.addEventListener('load', function() {
+    checkSession();
+});
+
+async function checkSession() {
+    try {
+        const response = await fetch('/api/v1/secure-auth/me', {
+            credentials: 'include'  // Include session cookie
+        });
+        
+        if (response.ok) {
+            const userData = await response.json();
+            showUserInfo(userData);
+        } else {
+            // No valid session
+            showLoginForm();
+        }
+    } catch (error) {
+        console.log('No active session');
+        showLoginForm();
+    }
+}
+
+function showUserInfo(userData) {
+    const container = document.querySelector('.container');
+    container.innerHTML = `
+        <div class="logo">
+            <h1>👋 Welcome Back!</h1>
+            <p>Secure Session Active</p>
+        </div>
+        
+        <div class="user-info" style="background: #f8f9fa; padding: 1rem; border-radius: 5px; margin-bottom: 1rem;">
+            <h3>User Information:</h3>
+            <p><strong>Name:</strong> ${userData.name}</p>
+            <p><strong>Email:</strong> ${userData.email}</p>
+            <p><strong>ID:</strong> ${userData.id}</p>
+        </div>
+        
+        <button onclick="logout()" class="btn" style="background: #dc3545;">Logout</button>
+        <button onclick="extendSession()" class="btn" style="background: #28a745; margin-top: 0.5rem;">Extend Session</button>
+        
+        <div class="links">
+            <a href="/docs">API Docs</a>
+            <a href="/">Home</a>
+        </div>
+    `;
+}
+
+function showLoginForm() {
+    // The form is already shown, just ensure it's visible
+    const container = document.querySelector('.container');
+    if (container) {
+        container.style.display = 'block';
+    }
+}
+
+// Wait for DOM to be fully loaded before adding event listeners
+document.addEventListener('DOMContentLoaded', function() {
+    const loginForm = document.getElementById('loginForm');
+    if (loginForm) {
+        loginForm.addEventListener('submit', handleLogin);
+    }
+    
+    // Check for existing session on page load
+    checkExistingSession();
+    
+    // Quick fallback: show login form if session check doesn't complete quickly
+    setTimeout(() => {
+        const loadingIndicator = document.getElementById('loadingIndicator');
+        
+        if (loadingIndicator && window.getComputedStyle(loadingIndicator).display !== 'none') {
+            console.log('Quick fallback: Showing login form after 800ms');
+            showLoginForm();
+        }
+    }, 800); // 800ms quick fallback
+    
+    // Absolute fallback: if loading takes too long, show login form anyway
+    setTimeout(() => {
+        const loadingIndicator = document.getElementById('loadingIndicator');
+        
+        if (loadingIndicator && window.getComputedStyle(loadingIndicator).display !== 'none') {
+            console.log('Fallback: Session check took too long, showing login form');
+            showLoginForm();
+        }
+    }, 2000); // 2 second absolute fallback
+});
+
+async function checkExistingSession() {
+    const loadingIndicator = document.getElementById('loadingIndicator');
+    const loginForm = document.getElementById('loginForm');
+    
+    try {
+        console.log('Checking for existing session at: /api/v1/secure-auth/me'); // Debug log
+        
+        // Create AbortController for timeout
+        const controller = new AbortController();
+        const timeoutId = setTimeout(() => {
+            controller.abort();
+            console.log('Session check aborted due to timeout');
+        }, 1500); // 1.5 second timeout
+        
+        const response = await fetch('/api/v1/secure-auth/me', {
+            method: 'GET',
+            credentials: 'include',  // Include cookies
+            signal: controller.signal
+        });
+        
+        clearTimeout(timeoutId); // Clear timeout if successful
+        console.log('Session check response status:', response.status); // Debug log
+        
+        if (response.ok) {
+            const userData = await response.json();
+            console.log('Found existing session for:', userData.email); // Debug log
+            
+            // Hide loading indicator
+            if (loadingIndicator) {
+                loadingIndicator.style.display = 'none';
+            }
+            
+            // Keep login form hidden
+            if (loginForm) {
+                loginForm.style.display = 'none';
+            }
+            
+            showMessage('Welcome back! Restoring your session...', 'success');
+            
+            // Show session dashboard
+            setTimeout(() => {
+                showSessionDashboard(userData);
+            }, 500);
+        } else {
+            console.log('No existing session found, status:', response.status); // Debug log
+            
+            // Hide loading indicator and show login form
+            showLoginForm();
+        }
+    } catch (error) {
+        console.error('Error checking existing session:', error.message);
+        
+        // Always show login form on any error (timeout, network, etc.)
+        showLoginForm();
+    }
+}
+
+function showLoginForm() {
+    const loadingIndicator = document.getElementById('loadingIndicator');
+    const loginForm = document.getElementById('loginForm');
+    const sessionDashboard = document.getElementById('sessionDashboard');
+    
+    // Hide loading indicator
+    if (loadingIndicator) {
+        loadingIndicator.style.display = 'none';
+    }
+    
+    // Hide session dashboard if it exists
+    if (sessionDashboard) {
+        sessionDashboard.style.display = 'none';
+    }
+    
+    // Show login form
+    if (loginForm) {
+        loginForm.style.display = 'block';
+    }
+    
+    // Ensure container is visible
+    const container = document.querySelector('.container');
+    if (container) {
+        container.style.display = 'block';
+    }
+}
+
+async function handleLogin(e) {
+    e.preventDefault();
+    
+    const email = document.getElementById('email').value;
+    const password = document.getElementById('password').value;
+    const loginBtn = document.getElementById('loginBtn');
+    
+    // Reset displays
+    hideMessage();
+    
+    // Disable button
+    loginBtn.disabled = true;
+    loginBtn.textContent = 'Logging in...';
+    
+    try {
+        console.log('Attempting login for:', email); // Debug log
+        
+        const response = await fetch('/api/v1/secure-auth/login', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                email: email,
+                password: password
+            }),
+            credentials: 'include'  // Important: include cookies
+        });
+        
+        console.log('Login response status:', response.status); // Debug log
+        const data = await response.json();
+        console.log('Login response data:', data); // Debug log
+        
+        if (response.ok) {
+            // Success - session-based login
+            showMessage('Login successful! Session created securely on server.', 'success');
+            
+            // Clear form
+            document.getElementById('loginForm').reset();
+            
+            // Show success message and redirect info
+            setTimeout(() => {
+                checkSession();
+            }, 1000);
+        } else {
+            // Error
+            showMessage(data.detail || 'Login failed', 'error');
+        }
+    } catch (error) {
+        console.error('Login error:', error); // Debug log
+        showMessage('Network error: ' + error.message, 'error');
+    } finally {
+        // Re-enable button
+        loginBtn.disabled = false;
+        loginBtn.textContent = 'Login';
+    }
+}
+
+function showMessage(text, type) {
+    let message = document.getElementById('message');
+    if (!message) {
+        // Create message div if it doesn't exist
+        const container = document.querySelector('.container');
+        message = document.createElement('div');
+        message.id = 'message';
+        message.className = 'message';
+        container.appendChild(message);
+    }
+    message.textContent = text;
+    message.className = 'message ' + type;
+    message.style.display = 'block';
+}
+
+function hideMessage() {
+    const message = document.getElementById('message');
+    if (message) {
+        message.style.display = 'none';
+    }
+}
+
+
+
+async function extendSession() {
+    try {
+        const response = await fetch('/api/v1/secure-auth/extend-session', {
+            method: 'POST',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            showMessage('Session extended successfully', 'success');
+        } else {
+            showMessage('Could not extend session', 'error');
+        }
+    } catch (error) {
+        showMessage('Network error', 'error');
+    }
+}
+
+async function checkSession() {
+    try {
+        const response = await fetch('/api/v1/secure-auth/me', {
+            method: 'GET',
+            credentials: 'include'  // Include cookies
+        });
+        
+        if (response.ok) {
+            const userData = await response.json();
+            showMessage(`Welcome back, ${userData.email}! Session is active.`, 'success');
+            
+            // Show logout option
+            setTimeout(() => {
+                showSessionInfo(userData);
+            }, 1000);
+        } else {
+            showMessage('No active session found.', 'error');
+        }
+    } catch (error) {
+        console.error('Session check error:', error);
+        showMessage('Session check failed: ' + error.message, 'error');
+    }
+}
+
+function showSessionInfo(userData) {
+    // Hide login form
+    const loginForm = document.getElementById('loginForm');
+    if (loginForm) {
+        loginForm.style.display = 'none';
+    }
+    
+    // Show dashboard
+    showSessionDashboard(userData);
+}
+
+async function showSessionDashboard(userData) {
+    const container = document.querySelector('.container');
+    let dashboardDiv = document.getElementById('sessionDashboard');
+    
+    if (!dashboardDiv) {
+        dashboardDiv = document.createElement('div');
+        dashboardDiv.id = 'sessionDashboard';
+        dashboardDiv.className = 'session-dashboard';
+        container.appendChild(dashboardDiv);
+    }
+    
+    // Show loading state
+    dashboardDiv.innerHTML = `
+        <div class="dashboard-header">
+            <h2>Session Dashboard</h2>
+            <button onclick="logout()" class="btn btn-secondary">Logout</button>
+        </div>
+        <p>Loading session data...</p>
+    `;
+    dashboardDiv.style.display = 'block';
+    
+    try {
+        // Fetch all user sessions
+        const response = await fetch('/api/v1/secure-auth/sessions', {
+            method: 'GET',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            const sessionData = await response.json();
+            renderDashboard(userData, sessionData);
+        } else {
+            dashboardDiv.innerHTML = `
+                <div class="dashboard-header">
+                    <h2>Session Dashboard</h2>
+                    <button onclick="logout()" class="btn btn-secondary">Logout</button>
+                </div>
+                <p class="error">Failed to load session data</p>
+            `;
+        }
+    } catch (error) {
+        console.error('Error loading sessions:', error);
+        dashboardDiv.innerHTML = `
+            <div class="dashboard-header">
+                <h2>Session Dashboard</h2>
+                <button onclick="logout()" class="btn btn-secondary">Logout</button>
+            </div>
+            <p class="error">Error loading session data: ${error.message}</p>
+        `;
+    }
+}
+
+const SESSION_COOKIE_RE = /(?:^|; )session_id=([^;]+)/;
+
+function renderDashboard(userData, sessionData) {
+    const dashboardDiv = document.getElementById('sessionDashboard');
+    // Single regex pass instead of split/find/split allocations
+    const cookieMatch = SESSION_COOKIE_RE.exec(document.cookie);
+    const currentSessionId = cookieMatch && cookieMatch[1];
+    
+    dashboardDiv.innerHTML = `
+        <div class="dashboard-header">
+            <div>
+                <h2>Welcome, ${userData.email}</h2>
+                <p style="margin: 0; color: #666;">User ID: ${userData.id}</p>
+            </div>
+            <div>
+                <button onclick="refreshDashboard()" class="btn" style="margin-right: 10px;">Refresh</button>
+                <button onclick="logoutAllDevices()" class="btn btn-warning" style="margin-right: 10px;">Logout All Devices</button>
+                <button onclick="logout()" class="btn btn-secondary">Logout</button>
+            </div>
+        </div>
+        
+        <div class="stats">
+            <div class="stat-item">
+                <div class="stat-number">${sessionData.active_sessions}</div>
+                <div class="stat-label">Active Sessions</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">${sessionData.sessions.length}</div>
+                <div class="stat-label">Total Sessions</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">1</div>
+                <div class="stat-label">Current Device</div>
+            </div>
+        </div>
+        
+        <h3>Active Sessions</h3>
+        <div class="session-list">
+            ${sessionData.sessions.map(session => {
+                const isCurrentSession = session.session_id === currentSessionId;
+                const createdAt = new Date(session.created_at).toLocaleString();
+                const lastAccessed = new Date(session.last_accessed).toLocaleString();
+                const expiresAt = new Date(session.expires_at).toLocaleString();
+                
+                return `
+                    <div class="session-item ${isCurrentSession ? 'current-session' : ''}">
+                        <div class="session-details">
+                            <div>
+                                <strong>${isCurrentSession ? '🔵 Current Session' : '📱 Other Device'}</strong>
+                                ${isCurrentSession ? ' (This Device)' : ''}
+                            </div>
+                            <div class="session-meta">
+                                <div><strong>Created:</strong> ${createdAt}</div>
+                                <div><strong>Last Active:</strong> ${lastAccessed}</div>
+                                <div><strong>Expires:</strong> ${expiresAt}</div>
+                                <div><strong>Session ID:</strong> ${session.session_id.substring(0, 8)}...</div>
+                            </div>
+                        </div>
+                        <div class="session-actions">
+                            ${!isCurrentSession ? 
+                                `<button onclick="terminateSession('${session.session_id}')" class="btn btn-danger btn-sm">Terminate</button>` : 
+                                '<span style="color: #007bff; font-weight: bold;">Current</span>'
+                            }
+                        </div>
+                    </div>
+                `;
+            }).join('')}
+        </div>
+        
+        <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd;">
+            <h3>Quick Actions</h3>
+            <button onclick="testProtectedEndpoint()" class="btn">Test Protected API</button>
+            <button onclick="extendCurrentSession()" class="btn" style="margin-left: 10px;">Extend Current Session</button>
+        </div>
+    `;
+}
+
+async function refreshDashboard() {
+    try {
+        const response = await fetch('/api/v1/secure-auth/me', {
+            method: 'GET',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            const userData = await response.json();
+            showSessionDashboard(userData);
+        } else {
+            showMessage('Failed to refresh dashboard', 'error');
+        }
+    } catch (error) {
+        showMessage('Error refreshing dashboard: ' + error.message, 'error');
+    }
+}
+
+async function terminateSession(sessionId) {
+    if (!confirm('Are you sure you want to terminate this session?')) {
+        return;
+    }
+    
+    try {
+        // Note: You'll need to add this endpoint to your backend
+        const response = await fetch(`/api/v1/secure-auth/sessions/${sessionId}`, {
+            method: 'DELETE',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            showMessage('Session terminated successfully', 'success');
+            refreshDashboard();
+        } else {
+            const error = await response.json();
+            showMessage('Failed to terminate session: ' + (error.detail || 'Unknown error'), 'error');
+        }
+    } catch (error) {
+        showMessage('Error terminating session: ' + error.message, 'error');
+    }
+}
+
+async function logoutAllDevices() {
+    if (!confirm('Are you sure you want to logout from all devices? This will end all your active sessions.')) {
+        return;
+    }
+    
+    try {
+        // Note: You'll need to add this endpoint to your backend
+        const response = await fetch('/api/v1/secure-auth/logout-all', {
+            method: 'POST',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            showMessage('Logged out from all devices successfully!', 'success');
+            setTimeout(() => {
+                location.reload();
+            }, 2000);
+        } else {
+            const error = await response.json();
+            showMessage('Failed to logout from all devices: ' + (error.detail || 'Unknown error'), 'error');
+        }
+    } catch (error) {
+        showMessage('Error logging out from all devices: ' + error.message, 'error');
+    }
+}
+
+async function extendCurrentSession() {
+    try {
+        // Note: You'll need to add this endpoint to your backend
+        const response = await fetch('/api/v1/secure-auth/extend-session', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                minutes: 30
+            }),
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            showMessage('Session extended by 30 minutes', 'success');
+            refreshDashboard();
+        } else {
+            const error = await response.json();
+            showMessage('Failed to extend session: ' + (error.detail || 'Unknown error'), 'error');
+        }
+    } catch (error) {
+        showMessage('Error extending session: ' + error.message, 'error');
+    }
+}
+
+async function logout() {
+    try {
+        const response = await fetch('/api/v1/secure-auth/logout', {
+            method: 'POST',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            showMessage('Logged out successfully!', 'success');
+            
+            // Hide dashboard
+            const dashboardDiv = document.getElementById('sessionDashboard');
+            if (dashboardDiv) {
+                dashboardDiv.style.display = 'none';
+            }
+            
+            // Hide any loading indicator
+            const loadingIndicator = document.getElementById('loadingIndicator');
+            if (loadingIndicator) {
+                loadingIndicator.style.display = 'none';
+            }
+            
+            // Show login form again
+            const loginForm = document.getElementById('loginForm');
+            if (loginForm) {
+                loginForm.style.display = 'block';
+                loginForm.reset();
+            }
+            
+            // Clear any messages after a delay
+            setTimeout(() => {
+                hideMessage();
+            }, 3000);
+        } else {
+            showMessage('Logout failed', 'error');
+        }
+    } catch (error) {
+        showMessage('Logout error: ' + error.message, 'error');
+    }
+}
+
+async function testProtectedEndpoint() {
+    try {
+        const response = await fetch('/api/v1/users/', {
+            method: 'GET',
+            credentials: 'include'
+        });
+        
+        if (response.ok) {
+            const users = await response.json();
+            showMessage(`Protected API works! Found ${users.length} users.`, 'success');
+        } else {
+            const error = await response.json();
+            showMessage(`Protected API failed: ${error.detail}`, 'error');
+        }
+    } catch (error) {
+        showMessage('API test error: ' + error.message, 'error');
+    }
+}
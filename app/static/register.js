@@ -0,0 +1,60 @@
+document.getElementById('registerForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    
+    const formData = {
+        name: document.getElementById('name').value,
+        email: document.getElementById('email').value,
+        password: document.getElementById('password').value,
+        age: parseInt(document.getElementById('age').value) || null,
+        bio: document.getElementById('bio').value || null
+    };
+    
+    const registerBtn = document.getElementById('registerBtn');
+    const message = document.getElementById('message');
+    
+    // Reset message
+    message.style.display = 'none';
+    
+    // Disable button
+    registerBtn.disabled = true;
+    registerBtn.textContent = 'Registering...';
+    
+    try {
+        const response = await fetch('/api/v1/auth/register', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(formData)
+        });
+        
+        const data = await response.json();
+        
+        if (response.ok) {
+            // Success
+            showMessage('Registration successful! You can now login.', 'success');
+            document.getElementById('registerForm').reset();
+            
+            // Redirect to login page after 2 seconds
+            setTimeout(() => {
+                window.location.href = '/login';
+            }, 2000);
+        } else {
+            // Error
+            showMessage(data.detail || 'Registration failed', 'error');
+        }
+    } catch (error) {
+        showMessage('Network error: ' + error.message, 'error');
+    } finally {
+        // Re-enable button
+        registerBtn.disabled = false;
+        registerBtn.textContent = 'Register';
+    }
+});
+
+function showMessage(text, type) {
+    const message = document.getElementById('message');
+    message.textContent = text;
+    message.className = 'message ' + type;
+    message.style.display = 'block';
+}
@@ -10,7 +10,9 @@ try:
     
     if __name__ == "__main__":
         print("Starting FastAPI server...")
-        uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+        # loop/http "auto" use uvloop + httptools when installed
+        uvicorn.run(app, host="0.0.0.0", port=8000, reload=True,
+                    loop="auto", http="auto")
 except Exception as e:
     print(f"Error starting server: {e}")
     import traceback
@@ -6,249 +6,429 @@ This script tests the database connection and provides detailed feedback.
 Run this to diagnose any connection issues.
 """
 
+import hashlib
+import json
 import os
+import socket
 import sys
-from dotenv import load_dotenv
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 # Add the app directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables
-load_dotenv()
+# Load .env only when the orchestrator hasn't already populated the
+# environment; containers and CI then skip the dotenv import and the
+# file stat/parse entirely
+if not os.getenv('DATABASE_HOST'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Imported once at module scope instead of inside each probe; missing
+# drivers short-circuit the probes with a clean message instead of an
+# ImportError mid-run
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+try:
+    from sqlalchemy import text
+except ImportError:
+    text = None
+
+@dataclass(frozen=True, slots=True)
+class DBConf:
+    """Connection settings, read from the environment once at import.
+
+    Every probe reads the same values, so one pass over os.environ here
+    replaces the repeated getenv calls (and their default-string
+    allocations) that were previously scattered through the functions —
+    and guarantees the probes can't disagree about defaults.
+    """
+    host: str
+    port: str
+    name: str
+    user: str
+    password: str
+    masked_password: str
+    # Explicit DATABASE_URL override, or None to build a structured
+    # URL from the individual fields in get_engine
+    url: str | None
+
+def _load_conf() -> DBConf:
+    """Build the frozen connection settings from the environment."""
+    host = os.getenv('DATABASE_HOST', 'localhost')
+    port = os.getenv('DATABASE_PORT', '5432')
+    name = os.getenv('DATABASE_NAME', 'backend_api_db')
+    user = os.getenv('DATABASE_USER', 'postgres')
+    password = os.getenv('DATABASE_PASSWORD', 'postgres')
+    return DBConf(
+        host=host,
+        port=port,
+        name=name,
+        user=user,
+        password=password,
+        masked_password='*' * len(password),
+        url=os.getenv("DATABASE_URL"),
+    )
+
+CONF = _load_conf()
+
+# Opt-in health cache for tight retry loops (CI retries, liveness
+# checks): a fresh "all probes passed" marker on disk lets a re-run
+# within PROBE_TTL seconds skip every round trip. Reading and writing
+# are gated behind --cache so a plain run always probes; a failed run
+# always clears the marker so stale health can't linger.
+_PROBE_TTL = int(os.getenv("PROBE_TTL", "60"))
+
+def _cache_path():
+    """Path of the health marker, keyed by the connection target."""
+    key = hashlib.blake2b(
+        f"{CONF.host}:{CONF.port}:{CONF.name}:{CONF.user}".encode(),
+        digest_size=8,
+    ).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"pg_probe_ok.{key}")
+
+def _cache_fresh():
+    """Return True if a healthy marker exists and is within the TTL."""
+    try:
+        with open(_cache_path()) as fh:
+            stamp = json.load(fh)
+        return bool(stamp.get("ok")) and time.time() - stamp["ts"] < _PROBE_TTL
+    except (OSError, ValueError, KeyError):
+        return False
+
+def _cache_store(ok):
+    """Record a healthy run, or clear the marker after a failed one."""
+    path = _cache_path()
+    try:
+        if ok:
+            with open(path, "w") as fh:
+                json.dump({"ts": time.time(), "ok": True}, fh)
+        elif os.path.exists(path):
+            os.unlink(path)
+    except OSError:
+        pass
+
+def _port_open(host, port, timeout=0.5):
+    """Check whether a TCP connection to host:port succeeds quickly.
+
+    A pg_isready-style precheck: if nothing is listening, this fails in
+    milliseconds, instead of every probe grinding through its own
+    connect timeout against a dead address.
+    """
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def _connect(dbname=None):
+    """Open a psycopg2 connection using the script's environment settings.
+
+    Connections are opened once in main() and shared across the probes:
+    the TCP + auth handshake costs far more than the trivial queries the
+    probes run, so paying it per probe dominated the script's runtime.
+    """
+    # libpq sets TCP_NODELAY on its sockets itself, so small
+    # query/response pairs don't hit Nagle delays and no socket-level
+    # fiddling is needed here. The keepalives stop a silently dead
+    # network path from hanging the script until the OS default (hours),
+    # and connect_timeout bounds the initial handshake the same way.
+    # jit=off: every query here is a trivial catalog lookup, so JIT
+    # compilation could only add startup cost; the application_name
+    # makes the probes identifiable in pg_stat_activity
+    return psycopg2.connect(
+        host=CONF.host,
+        port=CONF.port,
+        database=dbname or CONF.name,
+        user=CONF.user,
+        password=CONF.password,
+        application_name="pg-probe",
+        options="-c jit=off",
+        connect_timeout=5,
+        keepalives=1,
+        keepalives_idle=30,
+        keepalives_interval=10,
+        keepalives_count=5
+    )
+
+def _probe_all(conn):
+    """Run the version, database and table probes as one query.
+
+    Fusing the three lookups into a single SELECT means one network
+    round trip instead of three; on anything but a localhost socket the
+    round trips are the script's entire runtime.
+
+    Returns:
+        Dict with 'version', 'db_exists' and 'table_exists' keys
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT version(),
+                   EXISTS (SELECT 1 FROM pg_database WHERE datname = %s),
+                   EXISTS (
+                       SELECT FROM information_schema.tables
+                       WHERE table_schema = 'public'
+                       AND table_name = 'users'
+                   );
+            """,
+            (CONF.name,)
+        )
+        version, db_exists, table_exists = cursor.fetchone()
+    return {"version": version, "db_exists": db_exists, "table_exists": table_exists}
 
 def test_psycopg2_connection():
-    """Test raw psycopg2 connection."""
+    """Test raw psycopg2 connection.
+
+    Returns (connection, probe results) on success — the live connection
+    and the fused catalog probe for reuse by later checks — or
+    (None, None) on failure.
+    """
+    if psycopg2 is None:
+        print("❌ Raw psycopg2 connection: psycopg2 is not installed")
+        print("   Install it with: pip install psycopg2-binary")
+        return None, None
+
     try:
-        import psycopg2
-        
-        # Get connection details from environment
-        host = os.getenv('DATABASE_HOST', 'localhost')
-        port = os.getenv('DATABASE_PORT', '5432')
-        database = os.getenv('DATABASE_NAME', 'backend_api_db')
-        user = os.getenv('DATABASE_USER', 'postgres')
-        password = os.getenv('DATABASE_PASSWORD', 'postgres')
-        
         print("🔍 Testing PostgreSQL connection with psycopg2...")
-        print(f"   Host: {host}")
-        print(f"   Port: {port}")
-        print(f"   Database: {database}")
-        print(f"   User: {user}")
-        print(f"   Password: {'*' * len(password)}")
-        
-        # Attempt connection
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database=database,
-            user=user,
-            password=password
-        )
-        
-        # Test query
-        cursor = conn.cursor()
-        cursor.execute("SELECT version();")
-        version = cursor.fetchone()
-        
+        print(f"   Host: {CONF.host}")
+        print(f"   Port: {CONF.port}")
+        print(f"   Database: {CONF.name}")
+        print(f"   User: {CONF.user}")
+        print(f"   Password: {CONF.masked_password}")
+
+        # Attempt connection, then run all catalog probes in one query
+        conn = _connect()
+        probes = _probe_all(conn)
+
         print("✅ Raw psycopg2 connection: SUCCESS")
-        print(f"   PostgreSQL version: {version[0]}")
-        
-        cursor.close()
-        conn.close()
-        return True
-        
+        print(f"   PostgreSQL version: {probes['version']}")
+
+        return conn, probes
+
     except psycopg2.OperationalError as e:
         print("❌ Raw psycopg2 connection: FAILED")
         print(f"   Error: {e}")
-        return False
+        # SQLSTATE 3D000 (invalid_catalog_name): the server is up but
+        # the target database is missing — say so directly instead of
+        # making the reader decode the libpq message
+        if getattr(e, 'pgcode', None) == '3D000' or 'does not exist' in str(e):
+            print(f"   The server is reachable but database '{CONF.name}' does not exist.")
+            print("   Create it first:")
+            print(f"   CREATE DATABASE {CONF.name};")
+        return None, None
     except Exception as e:
         print("❌ Raw psycopg2 connection: UNEXPECTED ERROR")
         print(f"   Error: {e}")
-        return False
+        return None, None
+
+# The tail probes run on worker threads (psycopg2 releases the GIL
+# around libpq calls, so they genuinely overlap). Each probe buffers
+# its lines and emits them as one locked write, so parallel probes
+# can't interleave their output.
+_print_lock = threading.Lock()
+
+def _emit(lines):
+    """Print a probe's buffered output as one atomic block."""
+    with _print_lock:
+        print("\n".join(lines))
+
+_engine = None
+
+def get_engine():
+    """Build (once) and return the script's SQLAlchemy engine.
+
+    NullPool because this is a short-lived diagnostic: no idle
+    connection should be left sitting in a pool when the script exits,
+    and repeated runs in a loop or CI matrix reuse the cached engine
+    instead of re-initializing one per call.
+    """
+    global _engine
+    if _engine is None:
+        from sqlalchemy import create_engine
+        from sqlalchemy.engine import URL
+        from sqlalchemy.pool import NullPool
+
+        # URL.create hands create_engine a structured URL directly,
+        # skipping the f-string build + regex reparse round trip; an
+        # explicit DATABASE_URL still wins when set
+        url = CONF.url if CONF.url is not None else URL.create(
+            drivername="postgresql+psycopg2",
+            username=CONF.user,
+            password=CONF.password,
+            host=CONF.host,
+            port=int(CONF.port),
+            database=CONF.name,
+        )
+        _engine = create_engine(
+            url,
+            poolclass=NullPool,
+            connect_args={
+                "connect_timeout": 5,
+                # Same session settings as _connect: trivial queries
+                # gain nothing from JIT, and the name tags the probe
+                # in pg_stat_activity
+                "application_name": "pg-probe",
+                "options": "-c jit=off",
+            }
+        )
+    return _engine
 
 def test_sqlalchemy_connection():
     """Test SQLAlchemy connection."""
+    lines = ["\n🔍 Testing SQLAlchemy connection..."]
     try:
-        from sqlalchemy import create_engine, text
-        
-        # Build connection URL
-        database_url = os.getenv(
-            "DATABASE_URL", 
-            f"postgresql://{os.getenv('DATABASE_USER', 'postgres')}:"
-            f"{os.getenv('DATABASE_PASSWORD', 'postgres')}@"
-            f"{os.getenv('DATABASE_HOST', 'localhost')}:"
-            f"{os.getenv('DATABASE_PORT', '5432')}/"
-            f"{os.getenv('DATABASE_NAME', 'backend_api_db')}"
-        )
-        
-        print("\n🔍 Testing SQLAlchemy connection...")
-        print(f"   Connection URL: {database_url.replace(os.getenv('DATABASE_PASSWORD', 'postgresql'), '*' * len(os.getenv('DATABASE_PASSWORD', 'postgresql')))}")
-        
-        # Create engine
-        engine = create_engine(database_url)
-        
+        engine = get_engine()
+        # render_as_string masks the password field itself — unlike a
+        # blind str.replace, it can't clobber a scheme or username that
+        # happens to contain the same characters
+        lines.append(f"   Connection URL: {engine.url.render_as_string(hide_password=True)}")
+
         # Test connection
         with engine.connect() as conn:
             result = conn.execute(text("SELECT current_database(), current_user, version();"))
             row = result.fetchone()
-            
-            print("✅ SQLAlchemy connection: SUCCESS")
-            print(f"   Current database: {row[0]}")
-            print(f"   Current user: {row[1]}")
-            print(f"   PostgreSQL version: {row[2]}")
-            
+
+            lines.append("✅ SQLAlchemy connection: SUCCESS")
+            lines.append(f"   Current database: {row[0]}")
+            lines.append(f"   Current user: {row[1]}")
+            lines.append(f"   PostgreSQL version: {row[2]}")
+
+        _emit(lines)
         return True
-        
+
     except Exception as e:
-        print("❌ SQLAlchemy connection: FAILED")
-        print(f"   Error: {e}")
+        lines.append("❌ SQLAlchemy connection: FAILED")
+        lines.append(f"   Error: {e}")
+        _emit(lines)
         return False
 
 def test_app_database_connection():
     """Test the app's database configuration."""
+    lines = ["\n🔍 Testing app database configuration..."]
     try:
-        print("\n🔍 Testing app database configuration...")
-        
-        from app.database import engine, get_db, Base
-        from app.models import User
-        from sqlalchemy import text
-        
-        # Test engine connection
+        from app.database import engine
+
+        # Test engine connection and count rows on the same checkout; a
+        # plain Core count skips the ORM session and the subquery wrapper
+        # the ORM builds around count()
         with engine.connect() as conn:
             result = conn.execute(text("SELECT 1 as test;"))
             test_val = result.fetchone()[0]
-            
+
             if test_val == 1:
-                print("✅ App database engine: SUCCESS")
+                lines.append("✅ App database engine: SUCCESS")
             else:
-                print("❌ App database engine: UNEXPECTED RESULT")
+                lines.append("❌ App database engine: UNEXPECTED RESULT")
+                _emit(lines)
                 return False
-        
-        # Test session creation
-        db = next(get_db())
-        print("✅ App database session: SUCCESS")
-        
-        # Test model query
-        user_count = db.query(User).count()
-        print(f"✅ App model query: SUCCESS (found {user_count} users)")
-        
-        db.close()
+
+            user_count = conn.execute(text("SELECT count(*) FROM users;")).scalar()
+            lines.append(f"✅ App model query: SUCCESS (found {user_count} users)")
+
+        _emit(lines)
         return True
-        
-    except Exception as e:
-        print("❌ App database connection: FAILED")
-        print(f"   Error: {e}")
-        return False
 
-def check_database_exists():
-    """Check if the database exists."""
-    try:
-        import psycopg2
-        
-        host = os.getenv('DATABASE_HOST', 'localhost')
-        port = os.getenv('DATABASE_PORT', '5432')
-        user = os.getenv('DATABASE_USER', 'postgres')
-        password = os.getenv('DATABASE_PASSWORD', 'postgres')
-        
-        print("\n🔍 Checking if database exists...")
-        
-        # Connect to postgres database to check if our target database exists
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database='postgres',  # Connect to default postgres database
-            user=user,
-            password=password
-        )
-        
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (os.getenv('DATABASE_NAME', 'backend_api_db'),))
-        exists = cursor.fetchone()
-        
-        if exists:
-            print(f"✅ Database '{os.getenv('DATABASE_NAME', 'backend_api_db')}' exists")
-        else:
-            print(f"❌ Database '{os.getenv('DATABASE_NAME', 'backend_api_db')}' does not exist")
-            print("   You may need to create it first:")
-            print(f"   CREATE DATABASE {os.getenv('DATABASE_NAME', 'backend_api_db')};")
-        
-        cursor.close()
-        conn.close()
-        return bool(exists)
-        
     except Exception as e:
-        print("❌ Database existence check: FAILED")
-        print(f"   Error: {e}")
+        lines.append("❌ App database connection: FAILED")
+        lines.append(f"   Error: {e}")
+        _emit(lines)
         return False
 
-def check_table_exists():
-    """Check if the users table exists."""
+def check_database_exists(probes):
+    """Report whether the database exists, from the cached probe result.
+
+    Args:
+        probes: Result dict from _probe_all
+    """
+    lines = ["\n🔍 Checking if database exists..."]
+
+    exists = probes["db_exists"]
+    if exists:
+        lines.append(f"✅ Database '{CONF.name}' exists")
+    else:
+        lines.append(f"❌ Database '{CONF.name}' does not exist")
+        lines.append("   You may need to create it first:")
+        lines.append(f"   CREATE DATABASE {CONF.name};")
+
+    _emit(lines)
+    return bool(exists)
+
+def check_table_exists(conn, probes):
+    """Check if the users table exists.
+
+    Args:
+        conn: Open connection to the target database
+        probes: Result dict from _probe_all
+    """
+    lines = ["\n🔍 Checking if users table exists..."]
     try:
-        import psycopg2
-        
-        host = os.getenv('DATABASE_HOST', 'localhost')
-        port = os.getenv('DATABASE_PORT', '5432')
-        database = os.getenv('DATABASE_NAME', 'backend_api_db')
-        user = os.getenv('DATABASE_USER', 'postgres')
-        password = os.getenv('DATABASE_PASSWORD', 'postgres')
-        
-        print("\n🔍 Checking if users table exists...")
-        
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database=database,
-            user=user,
-            password=password
-        )
-        
+        exists = probes["table_exists"]
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = 'users'
-            );
-        """)
-        exists = cursor.fetchone()[0]
-        
         if exists:
-            print("✅ Users table exists")
-            
-            # Get table info
+            lines.append("✅ Users table exists")
+
+            # The server formats and joins the listing: one scalar comes
+            # back instead of a row per column, and the single print
+            # keeps the block in one stdout flush
             cursor.execute("""
-                SELECT column_name, data_type, is_nullable
+                SELECT string_agg(
+                    format('     %s: %s %s', column_name, data_type,
+                           CASE is_nullable WHEN 'YES' THEN 'NULL' ELSE 'NOT NULL' END),
+                    E'\\n' ORDER BY ordinal_position)
                 FROM information_schema.columns
-                WHERE table_name = 'users'
-                ORDER BY ordinal_position;
+                WHERE table_name = 'users';
             """)
-            columns = cursor.fetchall()
-            
-            print("   Table structure:")
-            for col_name, data_type, is_nullable in columns:
-                nullable = "NULL" if is_nullable == "YES" else "NOT NULL"
-                print(f"     {col_name}: {data_type} {nullable}")
-                
+            structure = cursor.fetchone()[0]
+            lines.append("   Table structure:\n" + (structure or "     (no columns)"))
+
         else:
-            print("❌ Users table does not exist")
-            print("   Run migrations to create it: alembic upgrade head")
-        
+            lines.append("❌ Users table does not exist")
+            lines.append("   Run migrations to create it: alembic upgrade head")
+
         cursor.close()
-        conn.close()
+        _emit(lines)
         return exists
-        
+
     except Exception as e:
-        print("❌ Table existence check: FAILED")
-        print(f"   Error: {e}")
+        lines.append("❌ Table existence check: FAILED")
+        lines.append(f"   Error: {e}")
+        _emit(lines)
         return False
 
 def main():
     """Run all database tests."""
+    use_cache = "--cache" in sys.argv[1:]
+
     print("🚀 PostgreSQL Connection Test")
     print("=" * 50)
-    
-    # Test 1: Raw psycopg2 connection
-    psycopg2_ok = test_psycopg2_connection()
-    
+
+    if use_cache and _cache_fresh():
+        print(f"✅ Cached: healthy within the last {_PROBE_TTL}s, skipping probes")
+        print("   Re-run without --cache to force a full check")
+        return
+
+    # Fast-fail before any driver work if nothing is listening at all
+    if not _port_open(CONF.host, CONF.port):
+        print(f"❌ Nothing is listening on {CONF.host}:{CONF.port}")
+        print("\n💡 Troubleshooting tips:")
+        print("   1. Make sure PostgreSQL is running")
+        print("   2. Check your .env file settings")
+        print("   3. Verify the host and port are correct")
+        _cache_store(False)
+        return
+
+    # Test 1: Raw psycopg2 connection (connection and fused catalog
+    # probe shared by the checks below)
+    conn, probes = test_psycopg2_connection()
+    psycopg2_ok = conn is not None
+
     if not psycopg2_ok:
         print("\n💡 Troubleshooting tips:")
         print("   1. Make sure PostgreSQL is running")
@@ -256,33 +436,57 @@ def main():
         print("   3. Verify the database user exists")
         print("   4. Check if password is correct")
         print("   5. Ensure the database exists")
+        _cache_store(False)
         return
-    
-    # Test 2: Check database exists
-    db_exists = check_database_exists()
-    
-    # Test 3: SQLAlchemy connection
-    sqlalchemy_ok = test_sqlalchemy_connection()
-    
-    # Test 4: App database connection
-    app_ok = test_app_database_connection()
-    
-    # Test 5: Check table exists
-    table_exists = check_table_exists()
-    
-    print("\n" + "=" * 50)
-    print("📊 TEST SUMMARY")
-    print("=" * 50)
-    print(f"Raw psycopg2 connection: {'✅ PASS' if psycopg2_ok else '❌ FAIL'}")
-    print(f"Database exists: {'✅ PASS' if db_exists else '❌ FAIL'}")
-    print(f"SQLAlchemy connection: {'✅ PASS' if sqlalchemy_ok else '❌ FAIL'}")
-    print(f"App database connection: {'✅ PASS' if app_ok else '❌ FAIL'}")
-    print(f"Users table exists: {'✅ PASS' if table_exists else '❌ FAIL'}")
-    
-    if all([psycopg2_ok, db_exists, sqlalchemy_ok, app_ok, table_exists]):
-        print("\n🎉 All tests passed! Your PostgreSQL connection is working perfectly!")
-    else:
-        print("\n⚠️  Some tests failed. Check the output above for details.")
+
+    try:
+        # Tests 2-5 are independent, so they run in parallel: psycopg2
+        # drops the GIL around libpq calls, and each probe uses its own
+        # connection (only check_table_exists touches conn), so total
+        # wall time is the slowest probe instead of the sum. Output
+        # stays readable because each probe emits one locked block.
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            futures = {
+                "db": ex.submit(check_database_exists, probes),
+                "sa": ex.submit(test_sqlalchemy_connection),
+                "app": ex.submit(test_app_database_connection),
+                "tbl": ex.submit(check_table_exists, conn, probes),
+            }
+            db_exists = futures["db"].result()
+            sqlalchemy_ok = futures["sa"].result()
+            app_ok = futures["app"].result()
+            table_exists = futures["tbl"].result()
+    finally:
+        conn.close()
+        if _engine is not None:
+            _engine.dispose()
+
+    # One write for the whole summary instead of a print per line
+    results = [
+        ("Raw psycopg2 connection", psycopg2_ok),
+        ("Database exists", db_exists),
+        ("SQLAlchemy connection", sqlalchemy_ok),
+        ("App database connection", app_ok),
+        ("Users table exists", table_exists),
+    ]
+    all_ok = all(ok for _, ok in results)
+    bar = "=" * 50
+    verdict = (
+        "🎉 All tests passed! Your PostgreSQL connection is working perfectly!"
+        if all_ok else
+        "⚠️  Some tests failed. Check the output above for details."
+    )
+    sys.stdout.write(
+        f"\n{bar}\n📊 TEST SUMMARY\n{bar}\n"
+        + "\n".join(f"{name}: {'✅ PASS' if ok else '❌ FAIL'}" for name, ok in results)
+        + f"\n\n{verdict}\n"
+    )
+    sys.stdout.flush()
+
+    # Record health only when caching was asked for; always clear a
+    # stale marker after a failed run
+    if use_cache or not all_ok:
+        _cache_store(all_ok)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file